@@ -0,0 +1 @@
+"""Offline benchmark harness: fixture replay, synthetic corpora, per-stage timings (see src.bench.run)."""
@@ -0,0 +1,81 @@
+# src/bench/corpus.py
+from __future__ import annotations
+import random
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from typing import Any, Dict, List, Optional
+
+# On-topic terms (overlap filters.include_keywords / topics) and filler
+_TOPIC = ["vector", "hybrid", "search", "ranking", "relevance", "retrieval", "catalog",
+          "personalization", "BM25", "ANN", "semantic", "ecommerce", "retail", "query"]
+_FILLER = ["team", "launch", "update", "platform", "latency", "index", "customers", "cost",
+           "pipeline", "model", "shoppers", "conversion", "results", "experiment", "release",
+           "scale", "traffic", "budget", "quality", "feature", "signals", "dashboard"]
+_OFF = ["crypto", "celebrity", "weather", "sports", "travel"]
+
+_SOURCES = [("Perplexity", 0.10), ("GitHub", 0.10), ("Reddit", 0.15), ("Elastic", 0.10),
+            ("OpenSearch", 0.10), ("Instacart", 0.10), ("Amazon Science", 0.10),
+            ("Shopify Engineering", 0.10), ("Flipkart Tech", 0.15)]
+_HOSTS = ["www.example-retail.com", "engineering.example.org", "blog.shopnow.io", "news.techdaily.com",
+          "reddit.com", "github.com", "algolia.com", "elastic.co", "research.example.edu"]
+
+
+def _sentence(rnd: random.Random, n: int, topical: float) -> str:
+    return " ".join(rnd.choice(_TOPIC) if rnd.random() < topical else rnd.choice(_FILLER) for _ in range(n))
+
+
+def synthetic_items(n: int, seed: int = 0, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """
+    n pipeline items shaped like collect_items() output, deterministic per seed.
+
+    Mix: ~10% near-duplicate reposts (same story, tweaked title), ~5% off-topic
+    (exclude_keywords), ~10% undated, dates spread over 60 days in both ISO and
+    RFC 822 form, 0-4 citations per item over a small host pool (including
+    social and competitor hosts) so link selection has real filtering to do.
+    """
+    rnd = random.Random(seed)
+    now = now or datetime.now(timezone.utc)
+    names = [s for s, _ in _SOURCES]
+    weights = [w for _, w in _SOURCES]
+    items: List[Dict[str, Any]] = []
+    for i in range(n):
+        if items and rnd.random() < 0.10:
+            base = rnd.choice(items[-200:])
+            it = dict(base)
+            it["title"] = base["title"] + rnd.choice([" (update)", "!", " — thread", ""])
+            it["source"] = rnd.choices(names, weights)[0]
+            it["url"] = f"https://{rnd.choice(_HOSTS)}/p/{i}"
+            items.append(it)
+            continue
+
+        source = rnd.choices(names, weights)[0]
+        off_topic = rnd.random() < 0.05
+        title = _sentence(rnd, rnd.randint(5, 11), 0.35).capitalize()
+        if off_topic:
+            title += " " + rnd.choice(_OFF)
+        summary = _sentence(rnd, rnd.randint(25, 60), 0.2)
+        content = summary + " " + _sentence(rnd, rnd.randint(80, 300), 0.15) if rnd.random() < 0.6 else summary
+
+        it: Dict[str, Any] = {
+            "source": source,
+            "title": f"[{source}] {title}" if source in ("GitHub", "Reddit") else title,
+            "url": f"https://{rnd.choice(_HOSTS)}/p/{i}",
+            "summary": summary,
+            "content": content,
+        }
+        if rnd.random() >= 0.10:
+            dt = now - timedelta(minutes=rnd.randint(0, 60 * 24 * 60))
+            if rnd.random() < 0.5:
+                it["date"] = dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+            else:
+                it["published"] = format_datetime(dt)
+        it["citations"] = [
+            {
+                "title": _sentence(rnd, 6, 0.3),
+                "url": f"https://{rnd.choice(_HOSTS)}/c/{rnd.randint(0, n * 2)}",
+                "date": (now - timedelta(days=rnd.randint(0, 90))).strftime("%Y-%m-%d") if rnd.random() < 0.7 else "",
+            }
+            for _ in range(rnd.randint(0, 4))
+        ]
+        items.append(it)
+    return items
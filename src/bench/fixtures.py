@@ -0,0 +1,175 @@
+# src/bench/fixtures.py
+from __future__ import annotations
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+class FixtureTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """
+    Offline stand-in for the network: answers every request from the fixture
+    store (routes.json + response files), so collectors, scrapers and both LLM
+    APIs run unmodified through src.utils.http.
+
+    Routes are tried in order; a route matches when its "match" string is a
+    substring of "host/path" and, if given, "body_contains" is in the request
+    body. "{{host}}" / "{{path}}" in a text fixture are replaced with the
+    requested host / path, so one feed file can stand in for every blog. latency_s adds a fixed delay per
+    request to mimic network round-trips (0 = pure CPU cost). Serves both the
+    pooled sync client and http.async_client() (the Reddit collector).
+    """
+
+    def __init__(self, fixture_dir: str = FIXTURE_DIR, latency_s: float = 0.0):
+        self.fixture_dir = fixture_dir
+        self.latency_s = latency_s
+        with open(os.path.join(fixture_dir, "routes.json"), "r", encoding="utf-8") as f:
+            self.routes: List[Dict[str, Any]] = json.load(f)
+        self._bodies: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+        self.hits: Counter = Counter()
+
+    def _body(self, name: str) -> bytes:
+        if name not in self._bodies:
+            with open(os.path.join(self.fixture_dir, name), "rb") as f:
+                self._bodies[name] = f.read()
+        return self._bodies[name]
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        request.read()
+        return self._respond(request)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self.latency_s:
+            await asyncio.sleep(self.latency_s)
+        await request.aread()
+        return self._respond(request)
+
+    def _respond(self, request: httpx.Request) -> httpx.Response:
+        target = f"{request.url.host}{request.url.path}"
+        body = request.content.decode("utf-8", "replace") if request.content else ""
+        for route in self.routes:
+            if route["match"] not in target:
+                continue
+            if route.get("body_contains") and route["body_contains"] not in body:
+                continue
+            with self._lock:
+                self.hits[route["file"]] += 1
+                content = self._body(route["file"])
+            content = content.replace(b"{{host}}", request.url.host.encode("ascii"))
+            content = content.replace(b"{{path}}", request.url.path.encode("ascii"))
+            return httpx.Response(
+                route.get("status", 200),
+                headers={"content-type": route.get("content_type", "application/octet-stream")},
+                content=content,
+                request=request,
+            )
+        return httpx.Response(404, content=b"no fixture", request=request)
+
+
+# OAuth token endpoints (host+path) whose responses must never be saved as-is
+TOKEN_ROUTES = frozenset({"www.reddit.com/api/v1/access_token"})
+_SECRET_KEYS = ("access_token", "refresh_token", "id_token")
+
+
+def _redact(content: bytes) -> bytes:
+    try:
+        data = json.loads(content)
+    except ValueError:
+        data = None
+    if not isinstance(data, dict):
+        return b'{"access_token": "redacted"}'
+    for k in _SECRET_KEYS:
+        if k in data:
+            data[k] = "redacted"
+    return json.dumps(data).encode("utf-8")
+
+
+class RecordingTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """
+    Pass requests through to the real network and save each distinct
+    host+path response into out_dir with a matching routes.json, so a live run
+    can refresh the fixture store. Responses are written verbatim, except
+    OAuth token responses, whose secrets are replaced with placeholders.
+    """
+
+    def __init__(self, out_dir: str, inner: Optional[httpx.BaseTransport] = None):
+        self.out_dir = out_dir
+        self.inner = inner or httpx.HTTPTransport()
+        self.inner_async = httpx.AsyncHTTPTransport()
+        self.routes: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        os.makedirs(out_dir, exist_ok=True)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        resp = self.inner.handle_request(request)
+        resp.read()
+        return self._save(request, resp)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        resp = await self.inner_async.handle_async_request(request)
+        await resp.aread()
+        return self._save(request, resp)
+
+    def _save(self, request: httpx.Request, resp: httpx.Response) -> httpx.Response:
+        match = f"{request.url.host}{request.url.path}"
+        with self._lock:
+            if not any(r["match"] == match for r in self.routes):
+                name = f"{len(self.routes):03d}_{request.url.host.replace('.', '_')}.bin"
+                content = _redact(resp.content) if match in TOKEN_ROUTES else resp.content
+                with open(os.path.join(self.out_dir, name), "wb") as f:
+                    f.write(content)
+                self.routes.append({
+                    "match": match,
+                    "file": name,
+                    "status": resp.status_code,
+                    "content_type": resp.headers.get("content-type", "application/octet-stream"),
+                })
+                with open(os.path.join(self.out_dir, "routes.json"), "w", encoding="utf-8") as f:
+                    json.dump(self.routes, f, indent=1)
+        # content is already decoded, so drop the encoding/length headers that described the wire bytes
+        headers = [(k, v) for k, v in resp.headers.items() if k.lower() not in ("content-encoding", "content-length")]
+        return httpx.Response(resp.status_code, headers=headers, content=resp.content, request=request)
+
+    def close(self) -> None:
+        self.inner.close()
+
+
+class FakeSMTP:
+    """
+    Drop-in for smtplib.SMTP as used by src.emailer.smtp: accepts starttls /
+    login / send_message and records the serialised size of each message.
+    """
+
+    sent: List[int] = []
+
+    def __init__(self, host: str = "", port: int = 0, *args, **kwargs):
+        self.host, self.port = host, port
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def starttls(self, *args, **kwargs):
+        return (220, b"ready")
+
+    def login(self, user, password):
+        return (235, b"ok")
+
+    def send_message(self, msg, *args, **kwargs):
+        FakeSMTP.sent.append(len(msg.as_bytes()))
+        return {}
+
+    def quit(self):
+        return (221, b"bye")
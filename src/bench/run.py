@@ -0,0 +1,215 @@
+"""
+Offline pipeline benchmarks. Usage:
+  python -m src.bench.run                                  # fixture pipeline + 1k/10k corpora
+  python -m src.bench.run --sizes 1000 10000 100000 --repeat 3
+  python -m src.bench.run --compare bench_results/<older>.json
+  python -m src.bench.run --record /tmp/fixtures_live      # refresh fixtures from the live APIs
+
+"pipeline" replays the recorded fixtures (RSS, scrape HTML, Reddit, GitHub,
+Perplexity, OpenAI) through src.utils.http and a fake SMTP server, timing
+collect_items, filter_rank, make_sections_for_pdfs, make_pdf and send_email. "corpus_<n>"
+times filter_rank / make_sections_for_pdfs / make_pdf on synthetic items.
+Each repeat starts from an empty cache dir, so numbers are cold-run costs.
+Results are written to bench_results/<utc>_<commit>.json for comparison.
+"""
+from __future__ import annotations
+import argparse
+import contextlib
+import copy
+import io
+import json
+import os
+import platform
+import shutil
+import smtplib
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List
+
+# Dummy credentials: requests never leave the fixture transport (unless --record)
+for _k, _v in {
+    "OPENAI_API_KEY": "bench", "PERPLEXITY_API_KEY": "bench", "GITHUB_TOKEN": "bench",
+    "REDDIT_CLIENT_ID": "bench", "REDDIT_CLIENT_SECRET": "bench",
+    "SMTP_USERNAME": "bench@example.com", "SMTP_APP_PASSWORD": "bench", "EMAIL_TO": "bench@example.com",
+}.items():
+    os.environ.setdefault(_k, _v)
+
+from src.bench.corpus import synthetic_items
+from src.bench.fixtures import FakeSMTP, FixtureTransport, RecordingTransport
+from src.utils import cache, http, resilience
+from src.utils.config import load_config
+from src.utils.logging import get_logger
+
+STAGES = ("collect_items", "filter_rank", "make_sections_for_pdfs", "make_pdf", "send_email")
+DOCS = (("Executive_Insights", "Executive Insights"), ("Consulting_News", "Consulting News"),
+        ("LinkedIn_Kit", "LinkedIn Draft Kit"))
+
+
+def _git(*args: str) -> str:
+    try:
+        return subprocess.run(["git", *args], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def _bench_config() -> Dict[str, Any]:
+    cfg = copy.deepcopy(load_config("config.yaml"))
+    # Per-host politeness gaps are deliberate sleeps, not pipeline cost
+    cfg.setdefault("enrich", {})["host_interval_s"] = 0
+    return cfg
+
+
+def _timed(timings: Dict[str, List[float]], stage: str, fn: Callable[[], Any]) -> Any:
+    t0 = time.perf_counter()
+    out = fn()
+    timings.setdefault(stage, []).append(time.perf_counter() - t0)
+    return out
+
+
+@contextlib.contextmanager
+def _fake_smtp():
+    real = smtplib.SMTP
+    smtplib.SMTP = FakeSMTP
+    try:
+        yield
+    finally:
+        smtplib.SMTP = real
+
+
+def _render(sections_by_doc, out_dir: str, qa: Dict[str, Any]) -> List[str]:
+    from src.output.pdf import make_pdf
+    paths = []
+    for (stem, suffix), sections in zip(DOCS, sections_by_doc):
+        path = os.path.join(out_dir, f"{stem}_bench.pdf")
+        make_pdf(path, f"Search Intel - {suffix}", (52, 152, 219), sections, qa=qa)
+        paths.append(path)
+    return paths
+
+
+def _run_once(cfg: Dict[str, Any], timings: Dict[str, List[float]], items=None) -> None:
+    """One cold pass. items=None: collect from fixtures; else use the given corpus."""
+    import src.main as pipeline
+    from src.emailer.smtp import send_email
+    from src.llm.provider import LLMProvider
+
+    work = tempfile.mkdtemp(prefix="search-intel-bench-")
+    try:
+        cache.configure({"cache": {"dir": os.path.join(work, "cache")}})
+        http.get_client()  # build the pooled client outside the timed stages
+
+        if items is None:
+            items = _timed(timings, "collect_items", lambda: pipeline.collect_items(cfg, get_logger()))
+        pool = _timed(timings, "filter_rank", lambda: pipeline.filter_rank(items, cfg))
+
+        llm = LLMProvider(cache=None)
+        models = {k: cfg.get("models", {}).get(k) for k in ("executive", "consulting", "linkedin")}
+        qa: Dict[str, Any] = {"counts": {"items": len(items)}}
+        sections = _timed(timings, "make_sections_for_pdfs",
+                          lambda: pipeline.make_sections_for_pdfs(llm, pool, cfg, models, meta=qa))
+        paths = _timed(timings, "make_pdf", lambda: _render(sections, work, qa))
+        with _fake_smtp():
+            _timed(timings, "send_email", lambda: send_email(
+                "[BENCH] Search Intel", "Attached.", os.environ["EMAIL_TO"], attachments=paths))
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def _summarise(timings: Dict[str, List[float]]) -> Dict[str, Dict[str, Any]]:
+    return {
+        stage: {
+            "median_s": round(statistics.median(runs), 6),
+            "min_s": round(min(runs), 6),
+            "runs_s": [round(r, 6) for r in runs],
+        }
+        for stage, runs in timings.items()
+    }
+
+
+def _print_table(results: Dict[str, Dict[str, Dict[str, Any]]], previous=None) -> None:
+    prev = (previous or {}).get("results", {})
+    for suite, stages in results.items():
+        print(f"\n{suite}")
+        for stage in STAGES:
+            if stage not in stages:
+                continue
+            med = stages[stage]["median_s"]
+            line = f"  {stage:<24} {med * 1000:10.1f} ms"
+            old = prev.get(suite, {}).get(stage, {}).get("median_s")
+            if old:
+                line += f"   was {old * 1000:10.1f} ms  ({med / old:5.2f}x)"
+            print(line)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Offline benchmarks for the search-intel pipeline")
+    ap.add_argument("--sizes", type=int, nargs="*", default=[1000, 10000],
+                    help="synthetic corpus sizes (e.g. 1000 10000 100000); none to skip")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--latency-ms", type=float, default=0.0, help="simulated per-request network latency")
+    ap.add_argument("--skip-pipeline", action="store_true", help="only run the synthetic corpora")
+    ap.add_argument("--out", default="bench_results", help="directory for the results JSON")
+    ap.add_argument("--compare", help="earlier results JSON to diff against")
+    ap.add_argument("--record", metavar="DIR", help="run once against the live APIs and save fixtures to DIR")
+    ap.add_argument("--verbose", action="store_true", help="show pipeline output")
+    args = ap.parse_args()
+
+    cfg = _bench_config()
+    http.configure(cfg)
+    resilience.configure(cfg)
+
+    if args.record:
+        rec = RecordingTransport(args.record)
+        http.set_transport(rec)
+        _run_once(cfg, {})
+        print(f"Recorded {len(rec.routes)} responses to {args.record}; review routes.json before committing")
+        return
+
+    transport = FixtureTransport(latency_s=args.latency_ms / 1000.0)
+    http.set_transport(transport)
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+
+    results: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    with quiet:
+        if not args.skip_pipeline:
+            timings: Dict[str, List[float]] = {}
+            for _ in range(args.repeat):
+                _run_once(cfg, timings)
+            results["pipeline"] = _summarise(timings)
+        for n in args.sizes:
+            corpus = synthetic_items(n, seed=n)
+            timings = {}
+            for _ in range(args.repeat):
+                _run_once(cfg, timings, items=[dict(it) for it in corpus])
+            results[f"corpus_{n}"] = _summarise(timings)
+
+    report = {
+        "commit": _git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "created": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "python": sys.version.split()[0],
+        "machine": f"{platform.system()} {platform.machine()} ({os.cpu_count()} cpu)",
+        "params": {"repeat": args.repeat, "sizes": args.sizes, "latency_ms": args.latency_ms},
+        "fixture_hits": dict(transport.hits),
+        "emails": len(FakeSMTP.sent),
+        "results": results,
+    }
+    os.makedirs(args.out, exist_ok=True)
+    path = os.path.join(args.out, f"{report['created'].replace(':', '')}_{report['commit'] or 'nogit'}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1)
+
+    previous = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+        print(f"Comparing against {previous.get('commit')} ({previous.get('created')})")
+    _print_table(results, previous)
+    print(f"\nSaved {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,26 @@
 import os
-import requests
+import threading
+import time
 from datetime import datetime, timezone
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Optional
+
+from src.utils import http, resilience
+from src.utils.cache import cache_path, key_for, read_json, write_json, CacheStats
+from src.utils.parallel import run_tasks
+
+GH_API = "https://api.github.com"
+GH_SEARCH_URL = GH_API + "/search/issues"
+
+# Bump when the cached item shape changes so old state is re-fetched.
+STATE_VERSION = 1
+
+_stats = CacheStats()
+
+
+def github_cache_stats():
+    """Hits = 304 Not Modified (free against the quota); misses = fetched."""
+    return _stats.as_dict()
 
-GH_SEARCH_URL = "https://api.github.com/search/issues"
 
 def _headers():
     token = os.getenv("GITHUB_TOKEN") or os.getenv("GITHUB_ACCESS_TOKEN")
@@ -12,32 +29,213 @@ def _headers():
         h["Authorization"] = f"Bearer {token}"
     return h
 
-def fetch_github_issues_repos(query: str, limit: int = 10) -> List[Dict[str, Any]]:
+
+class _RateLimit:
     """
-    Search issues/PRs across GitHub. Example query: 'ecommerce search relevance language:Python created:>2025-08-01'
+    Per-resource (core / search) view of X-RateLimit-Remaining / -Reset,
+    shared by the worker threads. Once a bucket is down to `reserve`
+    requests, callers sleep until its reset, or fail fast when that is
+    more than max_wait_s away.
+    """
+
+    def __init__(self, reserve: int = 2, max_wait_s: float = 60.0):
+        self.reserve = reserve
+        self.max_wait_s = max_wait_s
+        self._state: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def update(self, r) -> None:
+        try:
+            remaining = int(r.headers["x-ratelimit-remaining"])
+            reset = float(r.headers["x-ratelimit-reset"])
+        except (KeyError, ValueError):
+            return
+        with self._lock:
+            self._state[r.headers.get("x-ratelimit-resource", "core")] = (remaining, reset)
+
+    def wait(self, resource: str) -> None:
+        with self._lock:
+            remaining, reset = self._state.get(resource, (None, 0.0))
+        if remaining is None or remaining > self.reserve:
+            return
+        self.sleep(reset - time.time(), f"{resource} rate limit ({remaining} left)")
+        with self._lock:
+            if self._state.get(resource, (None, 0.0))[1] == reset:
+                del self._state[resource]  # window has reset; the next response tells us the new budget
+
+    def sleep(self, delay: float, why: str) -> None:
+        if delay <= 0:
+            return
+        if delay > self.max_wait_s:
+            raise RuntimeError(f"GitHub {why}; resets in {delay:.0f}s")
+        print(f"[GitHub] {why}; waiting {delay:.0f}s")
+        time.sleep(delay)
+
+
+def _retryable(r) -> bool:
+    """429/5xx, plus GitHub's rate-limit 403s (secondary limit or an empty primary bucket)."""
+    if r.status_code == 403:
+        return bool(r.headers.get("retry-after")) or r.headers.get("x-ratelimit-remaining") == "0"
+    return r.status_code in resilience.RETRY_STATUSES
+
+
+def _get(url: str, params, limiter: _RateLimit, resource: str, etag: Optional[str] = None):
+    """
+    One retry layer: resilience.call backs off (honouring Retry-After) and
+    limiter.wait() runs before every attempt, sleeping out an empty bucket.
+    """
+    headers = _headers()
+    if etag:
+        headers["If-None-Match"] = etag
+
+    def send():
+        r = http.get(url, headers=headers, params=params, timeout=30, retries=0)
+        limiter.update(r)
+        return r
+
+    return resilience.call(send, before=lambda: limiter.wait(resource), label="GitHub", retry_if=_retryable)
+
+
+def _incremental(key, url: str, params_for: Callable[[Optional[str]], Dict[str, Any]],
+                 to_item: Callable[[Dict[str, Any]], Dict[str, Any]], cursor_field: Optional[str],
+                 limit: int, max_pages: int, limiter: _RateLimit, resource: str = "core") -> List[Dict[str, Any]]:
+    """
+    One watched endpoint with state on disk: the newest `limit` items seen,
+    a `since` cursor sent via params_for(), and the ETag of the request made
+    with that cursor. Unchanged → 304 → cached items.
+
+    The cursor only moves forward (to the newest cursor_field seen) when a
+    response fills its window (limit reached or more pages). Otherwise the
+    next run sends the very same request, so its stored ETag still applies
+    and an endpoint that went quiet after new activity answers 304 again.
     """
-    params = {"q": query, "per_page": min(limit, 30)}
-    r = requests.get(GH_SEARCH_URL, headers=_headers(), params=params, timeout=30)
+    path = cache_path("github", key_for(key) + ".json")
+    state = read_json(path) or {}
+    if state.get("v") != STATE_VERSION:
+        state = {}
+    since = state.get("since")
+
+    r = _get(url, params_for(since), limiter, resource, etag=state.get("etag"))
+    if r.status_code == 304:
+        _stats.hit()
+        return state.get("items", [])
     r.raise_for_status()
-    data = r.json().get("items", []) or []
-    items: List[Dict[str, Any]] = []
-    for x in data[:limit]:
-        title = x.get("title") or ""
-        url = x.get("html_url") or ""
-        created = x.get("created_at") or datetime.now(timezone.utc).isoformat()
-        summary = (x.get("body") or "")[:400]
-        item = {
-            "title": f"[GitHub] {title}",
-            "summary": summary,
-            "url": url,
-            "source": "GitHub",
-            "date": created,
-            "tags": ["github", "search"],
-            "citations": [{"title": title, "url": url}],
-        }
-        items.append(item)
+    _stats.miss()
+    etag = r.headers.get("etag")
+
+    raw: List[Dict[str, Any]] = []
+    pages = 1
+    while True:
+        data = r.json()
+        raw += (data.get("items", []) if isinstance(data, dict) else data) or []
+        nxt = r.links.get("next", {}).get("url")
+        if not nxt or len(raw) >= limit or pages >= max_pages:
+            break
+        r = _get(nxt, None, limiter, resource)
+        r.raise_for_status()
+        pages += 1
+    full = bool(nxt) or len(raw) >= limit
+
+    merged = {it["url"]: it for it in state.get("items", [])}
+    merged.update((it["url"], it) for it in map(to_item, raw))  # newer copy wins
+    items = sorted(merged.values(), key=lambda it: it.get("date") or "", reverse=True)[:limit]
+
+    new_since = since
+    if full:
+        cursors = [x[cursor_field] for x in raw if cursor_field and x.get(cursor_field)]
+        new_since = max(cursors + ([since] if since else []), default=None)
+    write_json(path, {
+        "v": STATE_VERSION,
+        "key": key,
+        "since": new_since,
+        # The ETag belongs to the request with this cursor; a moved cursor is a new URL
+        "etag": etag if new_since == since else None,
+        "fetched_at": time.time(),
+        "items": items,
+    })
     return items
 
+
+def _issue_item(x: Dict[str, Any], tags: List[str]) -> Dict[str, Any]:
+    title = x.get("title") or ""
+    url = x.get("html_url") or ""
+    created = x.get("created_at") or datetime.now(timezone.utc).isoformat()
+    return {
+        "title": f"[GitHub] {title}",
+        "summary": (x.get("body") or "")[:400],
+        "url": url,
+        "source": "GitHub",
+        "date": created,
+        "tags": tags,
+        "citations": [{"title": title, "url": url}],
+    }
+
+
+def _release_item(x: Dict[str, Any], repo: str) -> Dict[str, Any]:
+    name = x.get("name") or x.get("tag_name") or ""
+    title = f"{repo} {name}".strip()
+    url = x.get("html_url") or ""
+    return {
+        "title": f"[GitHub] {title}",
+        "summary": (x.get("body") or "")[:400],
+        "url": url,
+        "source": "GitHub",
+        "date": x.get("published_at") or x.get("created_at") or "",
+        "tags": ["github", repo, "release"],
+        "citations": [{"title": title, "url": url}],
+    }
+
+
+def fetch_github(query: Optional[str] = None, limit: int = 10, repos: Optional[List[str]] = None,
+                 repo_limit: Optional[int] = None, releases: bool = True, max_concurrency: int = 4,
+                 max_pages: int = 3, max_wait_s: float = 60.0) -> List[Dict[str, Any]]:
+    """
+    Issue/PR search plus, per watched repo, recent issues and releases, all
+    fetched concurrently and incrementally (see _incremental). Results come
+    back in task order: search, then each repo's issues and releases.
+    """
+    limiter = _RateLimit(max_wait_s=max_wait_s)
+    repo_limit = repo_limit or limit
+    tasks = []
+    if query:
+        tasks.append((f"search:{query}", lambda: _incremental(
+            ("search", query, limit), GH_SEARCH_URL,
+            lambda since: {"q": f"{query} created:>={since}" if since else query, "per_page": min(limit, 100)},
+            lambda x: _issue_item(x, ["github", "search"]), "created_at",
+            limit, max_pages, limiter, resource="search",
+        )))
+    for repo in repos or []:
+        tasks.append((f"{repo} issues", lambda repo=repo: _incremental(
+            ("issues", repo, repo_limit), f"{GH_API}/repos/{repo}/issues",
+            lambda since: {"state": "all", "sort": "updated", "direction": "desc",
+                           "per_page": min(repo_limit, 100), **({"since": since} if since else {})},
+            lambda x: _issue_item(x, ["github", repo, "issue"]), "updated_at",
+            repo_limit, max_pages, limiter,
+        )))
+        if releases:
+            tasks.append((f"{repo} releases", lambda repo=repo: _incremental(
+                ("releases", repo, repo_limit), f"{GH_API}/repos/{repo}/releases",
+                lambda since: {"per_page": min(repo_limit, 100)},
+                lambda x: _release_item(x, repo), None,
+                repo_limit, 1, limiter,
+            )))
+
+    batches = run_tasks(
+        tasks,
+        max_workers=max_concurrency,
+        on_error=lambda label, e: print(f"[GitHub] {label} failed: {e}"),
+        default=[],
+    )
+    return [it for batch in batches for it in batch]
+
+
+def fetch_github_issues_repos(query: str, limit: int = 10) -> List[Dict[str, Any]]:
+    """
+    Search issues/PRs across GitHub. Example query: 'ecommerce search relevance language:Python created:>2025-08-01'
+    """
+    return fetch_github(query, limit)
+
+
 if __name__ == "__main__":
     q = "ecommerce search relevance language:Python sort:created-desc"
     for it in fetch_github_issues_repos(q, limit=5):
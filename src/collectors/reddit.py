@@ -1,65 +1,207 @@
+import asyncio
 import os
+import time
 from datetime import datetime, timezone
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
+from src.utils import http, resilience
+from src.utils.cache import cache_path, key_for, read_json, write_json
+
+TOKEN_URL = "https://www.reddit.com/api/v1/access_token"
+API_BASE = "https://oauth.reddit.com"
 
 SUBS = ["ecommerce", "retail", "elasticsearch", "opensearch", "searchengine", "MachineLearning"]
 # if a sub 404s, skip it silently instead of trying "hot" again
 
 
-try:
-    import praw  # pip install praw
-except ImportError as e:
-    raise RuntimeError("Missing dependency: praw (pip install praw)") from e
-
-def _praw_client():
+def _credentials():
     cid = os.getenv("REDDIT_CLIENT_ID")
     secret = os.getenv("REDDIT_CLIENT_SECRET")
     ua = os.getenv("REDDIT_USER_AGENT", "search-intel-agent/1.0")
     if not (cid and secret and ua):
         raise RuntimeError("Set REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET, REDDIT_USER_AGENT")
-    return praw.Reddit(
-        client_id=cid,
-        client_secret=secret,
-        user_agent=ua,
-    )
-
-def fetch_reddit_posts(subreddits: List[str], query: str, limit: int = 10) -> List[Dict[str, Any]]:
-    r = _praw_client()
-    items: List[Dict[str, Any]] = []
-    for sub in subreddits:
-        sr = r.subreddit(sub)
-        results = []
+    return cid, secret, ua
+
+
+async def _token(client, cid: str, secret: str, ua: str, fresh: bool = False) -> str:
+    """
+    OAuth bearer token, cached on disk until a minute before it expires.
+    Uses the password grant when REDDIT_USERNAME / REDDIT_PASSWORD are set
+    (the script-app flow in src.tests.test_reddit), else app-only client credentials.
+    fresh: drop the cached token first (it was rejected with a 401).
+    """
+    user, pwd = os.getenv("REDDIT_USERNAME"), os.getenv("REDDIT_PASSWORD")
+    path = cache_path("reddit", key_for(cid, user) + ".json")
+    if fresh:
         try:
-            # Try search first
-            results = list(sr.search(query, sort="new", limit=limit))
-            if not results:
-                # Some subs return empty for search; fallback
-                results = list(sr.hot(limit=limit))
-        except Exception as e:
-            # 404/403, etc. Fallback to hot
-            print(f"[Reddit] search failed on r/{sub}: {e} -> falling back to hot")
-            try:
-                results = list(sr.hot(limit=limit))
-            except Exception as e2:
-                print(f"[Reddit] hot failed on r/{sub}: {e2}")
-                results = []
-
-        for post in results[:limit]:
-            url = f"https://reddit.com{post.permalink}" if getattr(post, "permalink", None) else (getattr(post, "url", "") or "")
-            title = getattr(post, "title", "") or ""
-            summary = (getattr(post, "selftext", "") or "")[:400]
-            created = datetime.fromtimestamp(getattr(post, "created_utc", 0), tz=timezone.utc).isoformat()
-            items.append({
-                "title": f"[Reddit] {title}",
-                "summary": summary,
-                "url": url,
-                "source": "Reddit",
-                "date": created,
-                "tags": ["reddit", sub, "search"],
-                "citations": [{"title": title, "url": url}],
-            })
-    return items
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    cached = read_json(path)
+    if cached and cached.get("expires_at", 0) - 60 > time.time():
+        return cached["access_token"]
+
+    if user and pwd:
+        data = {"grant_type": "password", "username": user, "password": pwd}
+    else:
+        data = {"grant_type": "client_credentials"}
+    r = await client.post(TOKEN_URL, auth=(cid, secret), data=data, headers={"User-Agent": ua})
+    r.raise_for_status()
+    body = r.json()
+    token = body.get("access_token")
+    if not token:
+        raise RuntimeError(f"Reddit token request failed: {body}")
+    write_json(path, {"access_token": token, "expires_at": time.time() + float(body.get("expires_in", 3600))})
+    return token
+
+
+class _Auth:
+    """
+    Bearer token shared by the subreddit tasks. A 401 (revoked or rotated
+    token) refreshes it once for everyone instead of waiting out the cache.
+    """
+
+    def __init__(self, client, cid: str, secret: str, ua: str):
+        self.client, self.cid, self.secret, self.ua = client, cid, secret, ua
+        self.token: Optional[str] = None
+        self._lock = asyncio.Lock()
+
+    async def start(self) -> None:
+        self.token = await _token(self.client, self.cid, self.secret, self.ua)
+
+    def headers(self) -> Dict[str, str]:
+        return {"Authorization": f"bearer {self.token}", "User-Agent": self.ua}
+
+    async def refresh(self, rejected: Optional[str]) -> None:
+        async with self._lock:
+            if self.token == rejected:  # another task may have refreshed already
+                print("[Reddit] token rejected (401); fetching a new one")
+                self.token = await _token(self.client, self.cid, self.secret, self.ua, fresh=True)
+
+
+class _RateLimit:
+    """
+    Follows Reddit's X-Ratelimit-Remaining / X-Ratelimit-Reset headers: once
+    the window's budget is spent, requests wait for the reset instead of
+    collecting 429s, or fail fast when that is more than max_wait_s away.
+    """
+
+    def __init__(self, max_wait_s: float):
+        self.max_wait_s = max_wait_s
+        self.remaining: Optional[float] = None
+        self.reset_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def sleep(self, delay: float, why: str) -> None:
+        if delay <= 0:
+            return
+        if delay > self.max_wait_s:
+            raise RuntimeError(f"Reddit {why}; resets in {delay:.0f}s")
+        print(f"[Reddit] {why}; waiting {delay:.0f}s")
+        await asyncio.sleep(delay)
+
+    async def wait(self) -> None:
+        async with self._lock:
+            if self.remaining is not None and self.remaining < 1:
+                await self.sleep(self.reset_at - time.monotonic(), "rate limit reached")
+                self.remaining = None
+            if self.remaining is not None:
+                self.remaining -= 1  # reserve a slot for this request
+
+    def update(self, headers) -> None:
+        try:
+            remaining = float(headers["x-ratelimit-remaining"])
+            reset = float(headers["x-ratelimit-reset"])
+        except (KeyError, ValueError):
+            return
+        self.remaining = remaining
+        self.reset_at = time.monotonic() + reset
+
+
+async def _listing(client, limiter: _RateLimit, auth: _Auth, path: str, params) -> List[Dict[str, Any]]:
+    refreshed = throttled = False
+    while True:
+        await limiter.wait()
+        token = auth.token
+        r = await client.get(API_BASE + path, params=params, headers=auth.headers())
+        limiter.update(r.headers)
+        if r.status_code == 401 and not refreshed:
+            refreshed = True
+            await auth.refresh(token)
+            continue
+        if r.status_code == 429 and not throttled:
+            throttled = True
+            delay = resilience.retry_after_s(r.headers)
+            await limiter.sleep(float(r.headers.get("x-ratelimit-reset") or 1) if delay is None else delay,
+                                "HTTP 429")
+            continue
+        r.raise_for_status()
+        return [c.get("data", {}) for c in r.json().get("data", {}).get("children", [])]
+
+
+def _post_item(post: Dict[str, Any], sub: str) -> Dict[str, Any]:
+    permalink = post.get("permalink")
+    url = f"https://reddit.com{permalink}" if permalink else (post.get("url") or "")
+    title = post.get("title") or ""
+    created = datetime.fromtimestamp(post.get("created_utc") or 0, tz=timezone.utc).isoformat()
+    return {
+        "title": f"[Reddit] {title}",
+        "summary": (post.get("selftext") or "")[:400],
+        "url": url,
+        "source": "Reddit",
+        "date": created,
+        "tags": ["reddit", sub, "search"],
+        "citations": [{"title": title, "url": url}],
+    }
+
+
+async def _fetch_sub(client, limiter, auth, sub: str, query: str, limit: int) -> List[Dict[str, Any]]:
+    # raw_json: unescaped text; sr_detail off: skip the per-post subreddit blob
+    params = {"limit": limit, "raw_json": 1, "sr_detail": "false"}
+    hot = lambda: _listing(client, limiter, auth, f"/r/{sub}/hot", params)
+    try:
+        # Try search first
+        posts = await _listing(client, limiter, auth, f"/r/{sub}/search",
+                               {**params, "q": query, "restrict_sr": 1, "sort": "new"})
+        if not posts:
+            # Some subs return empty for search; fallback
+            posts = await hot()
+    except Exception as e:
+        # 404/403, etc. Fallback to hot
+        print(f"[Reddit] search failed on r/{sub}: {e} -> falling back to hot")
+        try:
+            posts = await hot()
+        except Exception as e2:
+            print(f"[Reddit] hot failed on r/{sub}: {e2}")
+            posts = []
+    return [_post_item(p, sub) for p in posts[:limit]]
+
+
+async def _fetch_all(subreddits: List[str], query: str, limit: int, max_concurrency: int) -> List[Dict[str, Any]]:
+    cid, secret, ua = _credentials()
+    sem = asyncio.Semaphore(max(1, int(max_concurrency)))
+    # Never sleep past what a single backoff may take; the source has its own timeout
+    limiter = _RateLimit(max_wait_s=float(resilience.setting("max_backoff_s")))
+    async with http.async_client() as client:
+        auth = _Auth(client, cid, secret, ua)
+        await auth.start()
+
+        async def _one(sub):
+            async with sem:
+                return await _fetch_sub(client, limiter, auth, sub, query, limit)
+
+        batches = await asyncio.gather(*(_one(sub) for sub in subreddits))
+    return [it for batch in batches for it in batch]
+
+
+def fetch_reddit_posts(subreddits: List[str], query: str, limit: int = 10,
+                       max_concurrency: int = 8) -> List[Dict[str, Any]]:
+    """
+    Search (falling back to hot) every subreddit concurrently over Reddit's
+    OAuth REST API; results come back in subreddit order.
+    """
+    _credentials()  # fail fast, before starting an event loop
+    return asyncio.run(_fetch_all(list(dict.fromkeys(subreddits)), query, limit, max_concurrency))
 
 
 if __name__ == "__main__":
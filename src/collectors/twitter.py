@@ -1,8 +1,9 @@
 import os
-import requests
 from datetime import datetime, timezone
 from typing import List, Dict, Any
 
+from src.utils import http
+
 TW_SEARCH_URL = "https://api.x.com/2/tweets/search/recent"  # alias domain; api.twitter.com works too
 
 def _headers():
@@ -21,7 +22,7 @@ def fetch_tweets(query: str, limit: int = 10) -> List[Dict[str, Any]]:
         "max_results": min(limit, 100),
         "tweet.fields": "created_at,author_id,lang,public_metrics",
     }
-    r = requests.get("https://api.twitter.com/2/tweets/search/recent", headers=_headers(), params=params, timeout=30)
+    r = http.get("https://api.twitter.com/2/tweets/search/recent", headers=_headers(), params=params, timeout=30)
     r.raise_for_status()
     data = r.json().get("data", []) or []
     items: List[Dict, Any] = []
@@ -1,10 +1,18 @@
 # src/ingest/perplexity_agent.py
 
-import os, time, json, requests, re
-from typing import List, Dict, Any
+import os, time, json, re, zlib
+from typing import List, Dict, Any, Optional
+
+from src.utils import http, resilience, trace
+from src.utils.cache import cache_path, key_for, read_json, write_json
+from src.utils.parallel import run_tasks
+from src.utils.ratelimit import TokenBucket
 
 PPLX_URL = "https://api.perplexity.ai/chat/completions"
 
+# How long a cached response stays valid, per search_recency_filter
+RECENCY_TTL_S = {"hour": 3600, "day": 86400, "week": 7 * 86400, "month": 30 * 86400, "year": 365 * 86400}
+
 def _headers():
     key = os.getenv("PPLX_API_KEY") or os.getenv("PERPLEXITY_API_KEY")
     if not key:
@@ -54,8 +62,16 @@ def _mk_payload(model: str, user_prompt: str, recency: str = None,
         payload["web_search_options"] = {"user_location": user_location}
     return payload
 
-def ask_perplexity(payload: Dict[str, Any]) -> Dict[str, Any]:
-    r = requests.post(PPLX_URL, headers=_headers(), data=json.dumps(payload), timeout=180)
+def ask_perplexity(payload: Dict[str, Any], limiter: Optional[TokenBucket] = None,
+                   retries: int = 3, backoff_s: float = 2.0) -> Dict[str, Any]:
+    """POST one request; retries 429/5xx and connection errors with jittered backoff (honours Retry-After)."""
+    r = resilience.call(
+        lambda: http.get_client().post(PPLX_URL, headers=_headers(), content=json.dumps(payload), timeout=180),
+        retries=retries,
+        backoff_s=backoff_s,
+        before=limiter.acquire if limiter else None,
+        label="Perplexity",
+    )
     r.raise_for_status()
     return r.json()
 
@@ -80,17 +96,49 @@ def parse_json_block(text: str):
     except Exception:
         return {}
 
+def _cache_file(model, topic, recency, search_mode, include_domains, exclude_domains, user_location) -> str:
+    key = key_for("pplx", model, topic, recency, search_mode,
+                  sorted(include_domains or []), sorted(exclude_domains or []), user_location)
+    return cache_path("perplexity", key + ".json")
+
+def inflate_raw(finding: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Return the raw response of a finding whether it was kept, compressed or dropped."""
+    if finding.get("raw") is not None:
+        return finding["raw"]
+    if finding.get("raw_z"):
+        return json.loads(zlib.decompress(finding["raw_z"]).decode("utf-8"))
+    return None
+
 def research_topics(topics: List[str], model: str = "sonar-pro", recency: str = "week",
                     search_mode: str = None, include_domains: List[str] = None,
-                    exclude_domains: List[str] = None, user_location: str = None):
-    out = []
-    for t in topics:
-        payload = _mk_payload(model, t, recency, search_mode, include_domains, exclude_domains, user_location)
-        resp = ask_perplexity(payload)
+                    exclude_domains: List[str] = None, user_location: str = None,
+                    max_concurrency: int = 4, rate_per_min: float = 30, use_cache: bool = True,
+                    raw: str = "keep"):
+    """
+    Research topics concurrently behind a shared token bucket (rate_per_min).
+    Responses are cached on disk for the recency window, keyed by model, topic
+    and filters. raw: "keep" | "compress" (zlib bytes in raw_z) | "drop".
+    A failing topic is logged and skipped; results keep topic order.
+    """
+    limiter = TokenBucket.per_minute(rate_per_min, burst=max_concurrency)
+    ttl = RECENCY_TTL_S.get(recency or "", 86400)
+
+    def _one(t: str) -> Dict[str, Any]:
+        path = _cache_file(model, t, recency, search_mode, include_domains, exclude_domains, user_location)
+        hit = read_json(path) if use_cache else None
+        with trace.span("perplexity.topic", cat="research", topic=t, model=model) as sp:
+            if hit and time.time() - hit.get("created", 0) <= ttl:
+                resp = hit["resp"]
+                sp.set(cached=True)
+            else:
+                payload = _mk_payload(model, t, recency, search_mode, include_domains, exclude_domains, user_location)
+                resp = ask_perplexity(payload, limiter=limiter)
+                if use_cache:
+                    write_json(path, {"created": time.time(), "resp": resp})
         text = extract_text(resp)
         cites = extract_citations(resp)
         obj = parse_json_block(text)
-        out.append({
+        finding = {
             "topic": t,
             "text": text,
             "summary": obj.get("summary") or "",
@@ -98,7 +146,15 @@ def research_topics(topics: List[str], model: str = "sonar-pro", recency: str =
             "takeaways": obj.get("takeaways") or [],
             "tags": obj.get("tags") or [],
             "citations": cites,
-            "raw": resp,
-        })
-        time.sleep(0.5)
-    return out
+            "raw": resp if raw == "keep" else None,
+        }
+        if raw == "compress":
+            finding["raw_z"] = zlib.compress(json.dumps(resp).encode("utf-8"))
+        return finding
+
+    results = run_tasks(
+        [(t, lambda t=t: _one(t)) for t in topics],
+        max_workers=max_concurrency,
+        on_error=lambda t, e: print(f"[Perplexity] research failed for '{t}': {e}"),
+    )
+    return [f for f in results if f is not None]
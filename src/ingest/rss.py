@@ -1,14 +1,76 @@
-import feedparser
-def fetch_rss(url: str, source_name: str):
-    feed = feedparser.parse(url)
+import hashlib, time
+from src.utils.dates import parse_dt
+from src.utils import http
+from src.utils.cache import cache_path, key_for, read_json, write_json, CacheStats
+
+# Bump when the cached item shape changes so old entries are re-fetched.
+# v2: items carry a normalised ISO 'date'
+FEED_CACHE_VERSION = 2
+
+_stats = CacheStats()
+
+def feed_cache_stats():
+    """Hits = feed unchanged since last run (304 or identical body); misses = downloaded + parsed."""
+    return _stats.as_dict()
+
+def _entries_to_items(feed, source_name: str):
     items = []
     for e in feed.entries[:20]:
+        dt = parse_dt(getattr(e, 'published_parsed', None) or getattr(e, 'updated_parsed', None))
         items.append({
             'source': source_name,
             'title': getattr(e, 'title', ''),
             'url': getattr(e, 'link', ''),
             'published': getattr(e, 'published', '') or getattr(e, 'updated', ''),
+            'date': dt.isoformat() if dt else '',
             'summary': getattr(e, 'summary', ''),
             'content': getattr(e, 'summary', ''),
         })
     return items
+
+def fetch_rss(url: str, source_name: str):
+    """
+    Conditional GET against the on-disk feed cache: send the stored ETag /
+    Last-Modified, and on 304 (or a byte-identical body) return the cached
+    items without re-parsing.
+    """
+    import feedparser
+
+    path = cache_path('feeds', key_for(url) + '.json')
+    cached = read_json(path)
+    if not cached or cached.get('v') != FEED_CACHE_VERSION:
+        cached = None
+
+    headers = {'User-Agent': feedparser.USER_AGENT}
+    if cached and cached.get('etag'):
+        headers['If-None-Match'] = cached['etag']
+    if cached and cached.get('modified'):
+        headers['If-Modified-Since'] = cached['modified']
+
+    r = http.get(url, headers=headers, timeout=30)
+    if r.status_code == 304 and cached:
+        _stats.hit()
+        return [dict(it, source=source_name) for it in cached['items']]
+    r.raise_for_status()
+
+    body_hash = hashlib.sha256(r.content).hexdigest()
+    if cached and cached.get('sha256') == body_hash:
+        # Server ignored the validators but nothing changed
+        _stats.hit()
+        items = cached['items']
+    else:
+        _stats.miss()
+        response_headers = {k.lower(): v for k, v in r.headers.items()}
+        response_headers.setdefault('content-location', str(r.url))
+        items = _entries_to_items(feedparser.parse(r.content, response_headers=response_headers), source_name)
+
+    write_json(path, {
+        'v': FEED_CACHE_VERSION,
+        'url': url,
+        'etag': r.headers.get('etag'),
+        'modified': r.headers.get('last-modified'),
+        'sha256': body_hash,
+        'fetched_at': time.time(),
+        'items': items,
+    })
+    return [dict(it, source=source_name) for it in items]
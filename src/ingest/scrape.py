@@ -1,37 +1,149 @@
-import requests
-from bs4 import BeautifulSoup
+import hashlib, re, time
+from urllib.parse import urlparse
+from src.utils import http
+from src.utils.cache import cache_path, key_for, read_json, write_json, CacheStats
+
 UA = {'User-Agent': 'Mozilla/5.0 (SearchIntel/1.0)'}
-def _get(url):
-    r = requests.get(url, headers=UA, timeout=20); r.raise_for_status(); return r
-def scrape_flipkart(url: str):
-    r = _get(url); soup = BeautifulSoup(r.text, 'html.parser')
-    cards = soup.select('article, div.post, div.card, li')
+
+# Bump when the cached item shape or extraction changes so pages are re-parsed.
+SCRAPE_CACHE_VERSION = 1
+
+# Fastest first; 'auto' picks the first one installed
+BACKENDS = ('selectolax', 'lxml', 'bs4')
+
+# Any site without a `scrape.sites` entry: every link with a title of 12+ chars
+GENERIC = {'select': 'a', 'min_title': 12}
+
+_stats = CacheStats()
+_TAG = re.compile(r'^([a-zA-Z][\w-]*)')
+
+def scrape_cache_stats():
+    """Hits = page unchanged since last run (304 or identical body); misses = downloaded + parsed."""
+    return _stats.as_dict()
+
+def _available(name):
+    try:
+        if name == 'selectolax': import selectolax.parser  # noqa: F401  (pip install selectolax)
+        elif name == 'lxml': import lxml.html, cssselect  # noqa: F401  (pip install lxml cssselect)
+        else: import bs4  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def pick_backend(name='auto'):
+    """Requested backend if installed, else the fastest available one."""
+    if name in BACKENDS and _available(name): return name
+    return next(b for b in BACKENDS if b == 'bs4' or _available(b))
+
+def site_spec(cfg, src):
+    """
+    Selector spec for a `type: scrape` source: its own `selectors`, else
+    scrape.sites[<host>] from config.yaml, else GENERIC. Keys:
+      select     CSS for the nodes to read, in document order
+      link       CSS for the anchor inside each node (omit when `select` hits anchors)
+      limit      read at most this many selected nodes
+      min_title  skip links with shorter text
+      dedupe_titles  skip a title already seen on the page
+      source     item source label (default: the page URL)
+    """
+    if src.get('selectors'): return dict(src['selectors'])
+    host = urlparse(src['url']).netloc.lower()
+    sites = (cfg.get('scrape', {}) or {}).get('sites', {}) or {}
+    spec = sites.get(host) or sites.get(host[4:] if host.startswith('www.') else 'www.' + host)
+    return dict(spec or GENERIC)
+
+def _strainer_tags(select):
+    """Top-level tag of every selector group, or None if any group doesn't start with a tag."""
+    tags = set()
+    for group in select.split(','):
+        m = _TAG.match(group.strip())
+        if not m: return None
+        tags.add(m.group(1).lower())
+    return sorted(tags)
+
+def _charset(r):
+    m = re.search(r'charset=([\w-]+)', r.headers.get('content-type', ''), re.I)
+    return m.group(1) if m else None
+
+def _text_join(strings):
+    return ''.join(s.strip() for s in strings)  # same as bs4 get_text(strip=True)
+
+# Each backend yields (title, href) for the first `limit` selected nodes, parsing the raw bytes.
+def _pairs_selectolax(content, charset, spec):
+    from selectolax.parser import HTMLParser
+    tree = HTMLParser(content)
+    for node in tree.css(spec['select'])[:spec.get('limit')]:
+        a = node.css_first(spec['link']) if spec.get('link') else node
+        if a is None: yield None, None; continue
+        yield a.text(strip=True), a.attributes.get('href')
+
+def _pairs_lxml(content, charset, spec):
+    import lxml.html
+    from lxml.cssselect import CSSSelector
+    parser = lxml.html.HTMLParser(encoding=charset) if charset else None
+    doc = lxml.html.document_fromstring(content, parser=parser)
+    link = CSSSelector(spec['link']) if spec.get('link') else None
+    for node in CSSSelector(spec['select'])(doc)[:spec.get('limit')]:
+        a = next(iter(link(node)), None) if link is not None else node
+        if a is None: yield None, None; continue
+        yield _text_join(a.itertext()), a.get('href')
+
+def _pairs_bs4(content, charset, spec):
+    from bs4 import BeautifulSoup, SoupStrainer
+    tags = _strainer_tags(spec['select'])
+    soup = BeautifulSoup(content, 'html.parser', from_encoding=charset,
+                         parse_only=SoupStrainer(tags) if tags else None)
+    for node in soup.select(spec['select'])[:spec.get('limit')]:
+        a = node.select_one(spec['link']) if spec.get('link') else node
+        if a is None: yield None, None; continue
+        yield a.get_text(strip=True), a.get('href')
+
+_PAIRS = {'selectolax': _pairs_selectolax, 'lxml': _pairs_lxml, 'bs4': _pairs_bs4}
+
+def _extract(url, content, charset, spec, backend):
+    source = spec.get('source') or url
+    min_title = int(spec.get('min_title', 1))
+    seen = set()
     items = []
-    for c in cards[:15]:
-        a = c.find('a')
-        if not a or not a.get('href'): continue
-        title = a.get_text(strip=True); href = a['href']
+    for title, href in _PAIRS[backend](content, charset, spec):
+        if not href or not title or len(title) < min_title: continue
+        if spec.get('dedupe_titles'):
+            if title in seen: continue
+            seen.add(title)
         if href.startswith('/'): href = url.rstrip('/') + href
-        if not title or len(title) < 8: continue
-        items.append({'source':'Flipkart Tech','title':title,'url':href,'published':'','summary':'','content':''})
-    return items
-def scrape_target(url: str):
-    r = _get(url); soup = BeautifulSoup(r.text, 'html.parser')
-    articles = soup.select('article a, h2 a, h3 a')
-    items, seen = [], set()
-    for a in articles[:20]:
-        href = a.get('href'); title = a.get_text(strip=True)
-        if not href or not title or title in seen: continue
-        seen.add(title)
-        if href.startswith('/'): href = url.rstrip('/') + href
-        items.append({'source':'Target Tech','title':title,'url':href,'published':'','summary':'','content':''})
+        items.append({'source':source,'title':title,'url':href,'published':'','summary':'','content':''})
     return items
+
+def scrape_site(url, spec=None, backend='auto'):
+    """
+    Links from one page per its selector spec (see site_spec), as a generator.
+    Conditional GET against the scrape cache: an unchanged page (304 or
+    identical body) returns the cached items without parsing.
+    """
+    spec = dict(spec or GENERIC)
+    backend = pick_backend(backend)
+    path = cache_path('scrape', key_for(url, spec) + '.json')
+    cached = read_json(path)
+    if not cached or cached.get('v') != SCRAPE_CACHE_VERSION:
+        cached = None
+
+    headers = dict(UA)
+    if cached and cached.get('etag'): headers['If-None-Match'] = cached['etag']
+    if cached and cached.get('modified'): headers['If-Modified-Since'] = cached['modified']
+    r = http.get(url, headers=headers, timeout=20)
+    if r.status_code == 304 and cached:
+        _stats.hit(); yield from cached['items']; return
+    r.raise_for_status()
+
+    body_hash = hashlib.sha256(r.content).hexdigest()
+    if cached and cached.get('sha256') == body_hash:
+        _stats.hit(); items = cached['items']
+    else:
+        _stats.miss(); items = _extract(url, r.content, _charset(r), spec, backend)
+    write_json(path, {'v': SCRAPE_CACHE_VERSION, 'url': url, 'etag': r.headers.get('etag'),
+                      'modified': r.headers.get('last-modified'), 'sha256': body_hash,
+                      'fetched_at': time.time(), 'items': items})
+    yield from items
+
 def scrape_generic(url: str):
-    r = _get(url); soup = BeautifulSoup(r.text, 'html.parser')
-    items = []
-    for a in soup.select('a'):
-        title = a.get_text(strip=True); href = a.get('href')
-        if not href or not title or len(title) < 12: continue
-        if href.startswith('/'): href = url.rstrip('/') + href
-        items.append({'source':url,'title':title,'url':href,'published':'','summary':'','content':''})
-    return items
+    return scrape_site(url, GENERIC)
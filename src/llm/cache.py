@@ -0,0 +1,105 @@
+# src/llm/cache.py
+from __future__ import annotations
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from src.utils.cache import cache_path, key_for, CacheStats
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key       TEXT PRIMARY KEY,
+    model     TEXT NOT NULL,
+    response  TEXT NOT NULL,
+    size      INTEGER NOT NULL,
+    created   REAL NOT NULL,
+    last_used REAL NOT NULL
+)
+"""
+
+
+class LLMCache:
+    """
+    Persistent, content-addressed store of LLM responses (SQLite).
+
+    Keyed by a hash of (model, system prompt, user prompt, temperature, max_tokens),
+    so any prompt change is a miss. Entries older than `ttl_s` are dropped; beyond
+    `max_entries` / `max_bytes` the least recently used go first.
+    """
+
+    def __init__(self, path: str, ttl_s: float = 14 * 86400,
+                 max_entries: int = 2000, max_bytes: int = 64 * 1024 * 1024):
+        self.path = path
+        self.ttl_s = float(ttl_s)
+        self.max_entries = int(max_entries)
+        self.max_bytes = int(max_bytes)
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        self.evict()
+
+    @classmethod
+    def from_config(cls, cfg: Dict[str, Any]) -> Optional["LLMCache"]:
+        """Build from `cache.llm` in config.yaml; None when disabled."""
+        lcfg = (cfg or {}).get("cache", {}).get("llm", {}) or {}
+        if not lcfg.get("enabled", True):
+            return None
+        return cls(
+            cache_path("llm_cache.sqlite"),
+            ttl_s=float(lcfg.get("ttl_hours", 336)) * 3600,
+            max_entries=lcfg.get("max_entries", 2000),
+            max_bytes=int(float(lcfg.get("max_mb", 64)) * 1024 * 1024),
+        )
+
+    @staticmethod
+    def make_key(model: str, system: str, user: str,
+                 temperature: Optional[float], max_tokens: Optional[int]) -> str:
+        return key_for("llm", model, system or "", user or "", temperature, max_tokens)
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row and now - row[1] <= self.ttl_s:
+                self._conn.execute("UPDATE llm_cache SET last_used = ? WHERE key = ?", (now, key))
+                self.stats.hit()
+                return row[0]
+            if row:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+        self.stats.miss()
+        return None
+
+    def put(self, key: str, model: str, response: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, model, response, size, created, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, len(response.encode("utf-8")), now, now),
+            )
+        self.evict()
+
+    def evict(self) -> None:
+        """Drop expired rows, then trim LRU rows past the entry/byte caps."""
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache WHERE created < ?", (time.time() - self.ttl_s,))
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                " SELECT key FROM llm_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                " SELECT key FROM (SELECT key, SUM(size) OVER (ORDER BY last_used DESC) AS running"
+                " FROM llm_cache) WHERE running > ?)",
+                (self.max_bytes,),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -1,8 +1,9 @@
 # src/llm/provider.py
 import os
-import requests
 from openai import OpenAI
 
+from src.utils import http, resilience, trace
+
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 PERPLEXITY_API_KEY = os.getenv("PERPLEXITY_API_KEY") or os.getenv("PPLX_API_KEY", "")
 
@@ -13,11 +14,24 @@ CONSULT_REPORT_MODEL = os.getenv("CONSULT_REPORT_MODEL", "sonar-pro")
 PPLX_URL = "https://api.perplexity.ai/chat/completions"
 
 class LLMProvider:
-    def __init__(self):
+    def __init__(self, cache=None):
+        """cache: optional src.llm.cache.LLMCache; None disables response caching."""
         if not OPENAI_API_KEY:
             raise RuntimeError("OPENAI_API_KEY not set")
-        # New SDK: let it read OPENAI_API_KEY from env internally
-        self.openai_client = OpenAI()
+        # New SDK: let it read OPENAI_API_KEY from env internally; share our keep-alive pool
+        self.openai_client = OpenAI(http_client=http.get_client())
+        self.cache = cache
+
+    def _cache_get(self, model, system, user, temperature, max_tokens):
+        """Return (key, cached_text); both None when caching is off."""
+        if self.cache is None:
+            return None, None
+        key = self.cache.make_key(model, system, user, temperature, max_tokens)
+        return key, self.cache.get(key)
+
+    def _cache_put(self, key, model, text):
+        if self.cache is not None and key and text:
+            self.cache.put(key, model, text)
 
     def _pplx_headers(self):
         if not PERPLEXITY_API_KEY:
@@ -30,7 +44,8 @@ class LLMProvider:
 
     def query_perplexity(self, prompt: str, model: str = EXEC_REPORT_MODEL) -> dict:
         payload = {"model": model, "messages": [{"role": "user", "content": prompt}]}
-        r = requests.post(PPLX_URL, headers=self._pplx_headers(), json=payload, timeout=180)
+        r = http.post(PPLX_URL, headers=self._pplx_headers(), json=payload, timeout=180,
+                      retries=resilience.setting("retries"))
         r.raise_for_status()
         return r.json()
 
@@ -42,13 +57,18 @@ class LLMProvider:
 
     def query_openai(self, prompt: str, model: str = LINKEDIN_MODEL,
                      temperature: float = 0.5, max_tokens: int = 1200) -> str:
+        key, hit = self._cache_get(model, "", prompt, temperature, max_tokens)
+        if hit is not None:
+            return hit
         resp = self.openai_client.chat.completions.create(
             model=model,
             messages=[{"role": "user", "content": prompt}],
             temperature=temperature,
             max_tokens=max_tokens,
         )
-        return resp.choices[0].message.content
+        text = resp.choices[0].message.content
+        self._cache_put(key, model, text)
+        return text
 
     def rewrite_for_linkedin(self, draft: str) -> str:
         return self.query_openai(
@@ -64,27 +84,45 @@ class LLMProvider:
         Simple chat wrapper so main.py can pass loaded prompt files.
         Uses OpenAI if model contains 'gpt', else Perplexity.
         """
-        if "gpt" in model:
-            resp = self.openai_client.chat.completions.create(
-                model=model,
-                messages=[{"role": "system", "content": system},
-                          {"role": "user", "content": user}],
-                temperature=0.2,
-            )
-            return (resp.choices[0].message.content or "").strip()
-
-        # Perplexity
-        import requests
-        headers = {"Authorization": f"Bearer {PERPLEXITY_API_KEY}", "Content-Type": "application/json"}
-        payload = {
-            "model": model,
-            "messages": [{"role": "system", "content": system}, {"role": "user", "content": user}],
-            "temperature": 0.2,
-        }
-        r = requests.post("https://api.perplexity.ai/chat/completions", json=payload, headers=headers, timeout=60)
-        r.raise_for_status()
-        data = r.json()
-        try:
-            return (data["choices"][0]["message"]["content"] or "").strip()
-        except Exception:
-         return str(data)
+        with trace.span("llm.chat", cat="llm", model=model) as sp:
+            key, hit = self._cache_get(model, system, user, 0.2, None)
+            if hit is not None:
+                sp.set(cached=True)
+                return hit
+
+            # Slow calls get a hedge request after resilience.hedge_after_s (first answer wins).
+            # Each branch is a single attempt, so a call costs at most two requests and
+            # finishes within hedge_after_s + llm_timeout_s.
+            timeout = resilience.setting("llm_timeout_s")
+            if "gpt" in model:
+                client = self.openai_client.with_options(max_retries=0)
+                resp = resilience.hedged(lambda: client.chat.completions.create(
+                    model=model,
+                    messages=[{"role": "system", "content": system},
+                              {"role": "user", "content": user}],
+                    temperature=0.2,
+                    timeout=timeout,
+                ), label="OpenAI")
+                text = (resp.choices[0].message.content or "").strip()
+                self._cache_put(key, model, text)
+                return text
+
+            # Perplexity
+            headers = {"Authorization": f"Bearer {PERPLEXITY_API_KEY}", "Content-Type": "application/json"}
+            payload = {
+                "model": model,
+                "messages": [{"role": "system", "content": system}, {"role": "user", "content": user}],
+                "temperature": 0.2,
+            }
+            r = resilience.hedged(lambda: http.post(
+                PPLX_URL, json=payload, headers=headers, timeout=timeout,
+            ), label="Perplexity")
+            r.raise_for_status()
+            data = r.json()
+            try:
+                text = (data["choices"][0]["message"]["content"] or "").strip()
+            except Exception:
+             return str(data)  # malformed response: pass through, never cache
+            self._cache_put(key, model, text)
+            return text
+
@@ -2,30 +2,27 @@ import os
 import argparse
 import datetime
 import json
+import queue
+import re
+import threading
 from src.prompts import load_prompt, PromptNotFound
-from datetime import datetime, timezone, timedelta
+from datetime import date, datetime, timezone, timedelta
 
 from src.utils.config import load_config
 from src.utils.logging import get_logger
-from src.utils.ranking import rank_items, dedupe_items
-
-from src.ingest.rss import fetch_rss
-from src.ingest.scrape import scrape_flipkart, scrape_target, scrape_generic
+from src.utils.ranking import rank_items, dedupe_items, TopK
+from src.utils.parallel import run_tasks
+from src.utils import http, cache, resilience, trace
 from src.utils.run_meta import collect_run_meta
 
+# Heavy stages (feedparser, bs4, httpx, numpy, openai, fpdf, smtplib) are imported
+# where they're used: a --schedule exit or a disabled source pays nothing for them.
 from src.process.filter_rank import (
-    is_relevant,
+    match_keywords,
     compute_id,
-    basic_score,
     clean_text,
 )
 
-from src.utils.links import (
-    extract_links_from_items, dedupe_links, sort_links_by_date_desc,
-    filter_exec, filter_cons, filter_li, filter_by_recency,
-    add_date_suffix, pick_top
-)
-
 from src.utils.dates import fmt_short_date
 
 def _cfg_links(cfg, key, default):
@@ -33,16 +30,7 @@ def _cfg_links(cfg, key, default):
 
 from src.process.summarize import summarize_text  # kept for future use
 
-from src.ingest.perplexity_agent import research_topics
-
-
-from src.output.pdf import make_pdf
 from src.output.linkedin import generate_linkedin_posts
-from src.emailer.smtp import send_email
-
-from src.collectors.reddit import fetch_reddit_posts
-from src.collectors.twitter import fetch_tweets
-from src.collectors.github import fetch_github_issues_repos
 
 # Safe domain filters for LinkedIn links
 COMPETITOR_DENYLIST = {
@@ -122,56 +110,111 @@ def build_comment_kit_links(items, limit=6):
                     return out
         return out
 
-def _compact_items_for_llm(items):
-            """
-            Slim down items for prompts: title, brief summary, date, source, citations.
-            """
-            out = []
-            for it in items:
-                out.append({
-                    "title": it.get("title"),
-                    "summary": (it.get("summary") or "")[:400],
-                    "date": it.get("date"),
-                    "source": it.get("source"),
-                    "citations": it.get("citations", []),
-                })
-            return out
-
-def _ultralight_items_for_linkedin(items):
-        out = []
-        for it in items[:12]:  # cap to keep prompt small
-            out.append({
-                "title": it.get("title"),
-                "summary": (it.get("summary") or "")[:200],
-                "citations": [c for c in (it.get("citations") or [])[:1]],  # at most 1
-            })
-        return out
+def _compact_item(it):
+    """Prompt shape for executive/consulting: title, brief summary, date, source, citations."""
+    return {
+        "title": it.get("title"),
+        "summary": (it.get("summary") or "")[:400],
+        "date": it.get("date"),
+        "source": it.get("source"),
+        "citations": it.get("citations", []),
+    }
+
+def _ultralight_item(it):
+    """Prompt shape for LinkedIn: title, short summary, at most one citation."""
+    return {
+        "title": it.get("title"),
+        "summary": (it.get("summary") or "")[:200],
+        "citations": [c for c in (it.get("citations") or [])[:1]],  # at most 1
+    }
+
+_PLACEHOLDER = re.compile(r"\{\{(\w+)\}\}|\{(\w+)\}")
+
+def _render_prompt(template: str, **values) -> str:
+    """
+    Fill {{name}} and {name} placeholders (the prompt files use both styles).
+    Unknown names and any other braces are left untouched.
+    """
+    def _sub(m):
+        key = m.group(1) or m.group(2)
+        return str(values[key]) if key in values else m.group(0)
+    return _PLACEHOLDER.sub(_sub, template)
+
 def in_biweekly_window(cfg) -> bool:
     """Return True only on the intended bi-weekly Monday."""
-    anchor = datetime.date.fromisoformat(
+    anchor = date.fromisoformat(
         cfg["schedule"].get("biweekly_anchor_date", "2025-08-11")
     )
-    today = datetime.date.today()
+    today = date.today()
     is_monday = today.weekday() == 0
     delta_days = (today - anchor).days
     return is_monday and (delta_days % 14 == 0)
 
 
-def collect_items(cfg, logger):
-    """Fetch from vendor + retail tech sources defined in config.yaml."""
-    items = []
+def _guarded(fn, log, message):
+    """
+    Wrap a source fetch (list or generator) so a failure is logged and ends the
+    source; items it yielded before failing are kept.
+    """
+    def _run():
+        try:
+            yield from fn()
+        except Exception as e:
+            log(f"{message}: {e}")
+    return _run
+
+
+def _traced_source(label, fn):
+    """Wrap a source fetch in a per-source trace span (no-op unless tracing is on)."""
+    def _run():
+        with trace.span(f"source:{label}", cat="collect") as sp:
+            n = 0
+            for it in fn():
+                n += 1
+                yield it
+            sp.set(items=n)
+    return _run
+
+
+def _perplexity_items(findings):
+    out = []
+    for f in findings:
+        out.append({
+            "title": f["headline"] or f["topic"],
+            "summary": f["summary"],
+            "content": f["text"],
+            "source": "Perplexity",
+            "citations": f["citations"],  # <-- must be present
+            "tags": f["tags"],
+        })
+    return out
+
+
+def _collection_sources(cfg, logger):
+    """
+    Build the (label, fetch) list for every enabled source, in config order.
+    Each fetch swallows and logs its own errors, exactly like the old serial loop.
+    """
+    sources = []
 
     # Reddit
     rcfg = cfg.get("sources", {}).get("reddit", {})
     if rcfg.get("enabled"):
-        try:
-            items += fetch_reddit_posts(
-                rcfg.get("subreddits", []),
+        from src.collectors.reddit import fetch_reddit_posts
+        subreddits = list(rcfg.get("subreddits", []))
+        community = cfg.get("communities", {}).get("reddit", {})
+        if community.get("enabled"):
+            known = {s.lower() for s in subreddits}
+            subreddits += [s for s in community.get("subreddits", []) if s.lower() not in known]
+        sources.append(("Reddit", _guarded(
+            lambda: fetch_reddit_posts(
+                subreddits,
                 rcfg.get("query", "search relevance"),
                 rcfg.get("limit", 5),
-            )
-        except Exception as e:
-            logger.error(f"Reddit fetch failed: {e}")
+                max_concurrency=rcfg.get("max_concurrency", 8),
+            ),
+            logger.error, "Reddit fetch failed",
+        )))
 
     # Twitter (X)
     """     tcfg = cfg.get("sources", {}).get("twitter", {})
@@ -187,89 +230,262 @@ def collect_items(cfg, logger):
     # GitHub
     gcfg = cfg.get("sources", {}).get("github", {})
     if gcfg.get("enabled"):
-        try:
-            items += fetch_github_issues_repos(
+        from src.collectors.github import fetch_github
+        community = cfg.get("communities", {}).get("github", {})
+        sources.append(("GitHub", _guarded(
+            lambda: fetch_github(
                 gcfg.get("query", "ecommerce search relevance sort:created-desc"),
                 gcfg.get("limit", 5),
-            )
-        except Exception as e:
-            logger.error(f"GitHub fetch failed: {e}")
+                repos=community.get("repos", []) if community.get("enabled") else [],
+                repo_limit=gcfg.get("repo_limit"),
+                releases=gcfg.get("releases", True),
+                max_concurrency=gcfg.get("max_concurrency", 4),
+                max_pages=gcfg.get("max_pages", 3),
+                max_wait_s=gcfg.get("max_rate_wait_s", 60),
+            ),
+            logger.error, "GitHub fetch failed",
+        )))
+
+    from src.ingest.rss import fetch_rss
 
     # Vendor blogs (RSS)
     for src in cfg.get("sources", {}).get("vendor_blogs", []):
         if src["type"] == "rss":
-            try:
-                items.extend(fetch_rss(src["url"], src["name"]))
-            except Exception as e:
-                logger.warning(f"RSS failed for {src['name']}: {e}")
+            sources.append((src["name"], _guarded(
+                lambda src=src: fetch_rss(src["url"], src["name"]),
+                logger.warning, f"RSS failed for {src['name']}",
+            )))
 
     # Retail tech blogs (RSS or scrape)
     for src in cfg.get("sources", {}).get("retail_tech_blogs", []):
-        try:
-            if src["type"] == "rss":
-                items.extend(fetch_rss(src["url"], src["name"]))
-            elif src["type"] == "scrape":
-                url = src["url"]
-                if "flipkart" in url:
-                    items.extend(scrape_flipkart(url))
-                elif "tech.target.com" in url:
-                    items.extend(scrape_target(url))
-                else:
-                    items.extend(scrape_generic(url))
-        except Exception as e:
-            label = src.get("name", src.get("url"))
-            logger.warning(f"Scrape failed for {label}: {e}")
-
+        label = src.get("name", src.get("url"))
+        if src["type"] == "rss":
+            fetch = lambda src=src: fetch_rss(src["url"], src["name"])
+        elif src["type"] == "scrape":
+            from src.ingest.scrape import scrape_site, site_spec
+            backend = cfg.get("scrape", {}).get("backend", "auto")
+            fetch = lambda src=src, spec=site_spec(cfg, src): scrape_site(src["url"], spec, backend)
+        else:
+            continue
+        sources.append((label, _guarded(fetch, logger.warning, f"Scrape failed for {label}")))
 
+    # Perplexity: research_topics fans topics out itself, behind one rate limiter
     rcfg = cfg.get("research", {})
     if rcfg.get("use_perplexity"):
-        findings = research_topics(
-            topics=rcfg.get("topics", []),
-            model=rcfg.get("model", "sonar-pro"),
-            recency=rcfg.get("search_recency_filter", "week"),
-            search_mode=rcfg.get("search_mode"),
-            include_domains=rcfg.get("include_domains"),
-            exclude_domains=rcfg.get("exclude_domains"),
-            user_location=rcfg.get("user_location"),
-        )
-        for f in findings:
-            items.append({
-                "title": f["headline"] or f["topic"],
-                "summary": f["summary"],
-                "content": f["text"],
-                "source": "Perplexity",
-                "citations": f["citations"],  # <-- must be present
-                "tags": f["tags"],
-            })
+        from src.ingest.perplexity_agent import research_topics
+        sources.append(("Perplexity", _guarded(
+            lambda: _perplexity_items(research_topics(
+                topics=rcfg.get("topics", []),
+                model=rcfg.get("model", "sonar-pro"),
+                recency=rcfg.get("search_recency_filter", "week"),
+                search_mode=rcfg.get("search_mode"),
+                include_domains=rcfg.get("include_domains"),
+                exclude_domains=rcfg.get("exclude_domains"),
+                user_location=rcfg.get("user_location"),
+                max_concurrency=rcfg.get("max_concurrency", 4),
+                rate_per_min=rcfg.get("rate_per_min", 30),
+                use_cache=rcfg.get("cache", True),
+                raw=rcfg.get("raw_payloads", "drop"),
+            )),
+            logger.error, "Perplexity research failed",
+        )))
+
+    return sources
+
+
+_DONE = object()
+
+
+def stream_items(cfg, logger):
+    """
+    Yield (order, item) as sources produce them, order = (source index in
+    config order, position within the source) so consumers can rank
+    deterministically whichever source finishes first.
+
+    Sources run concurrently on a bounded pool (see `collection` in config.yaml)
+    and feed a bounded queue, so a slow consumer throttles the collectors
+    instead of letting everything pile up in memory. Sources abandoned at
+    their timeout or the deadline keep whatever they yielded before it.
+    """
+    ccfg = cfg.get("collection", {})
+    q = queue.Queue(maxsize=ccfg.get("queue_size", 256))
+    closed = threading.Event()
+
+    def _put(entry):
+        while not closed.is_set():
+            try:
+                q.put(entry, timeout=0.25)
+                return True
+            except queue.Full:
+                continue
+        return False
 
-    return items
+    def _pump(idx, label, fn):
+        def _run():
+            for n, it in enumerate(_traced_source(label, fn)()):
+                if not _put(((idx, n), it)):
+                    break  # consumer is gone
+        return _run
 
+    sources = _collection_sources(cfg, logger)
 
-def filter_rank(items, cfg):
-    """Keyword filter + basic dedupe/ranking."""
-    include = cfg.get("filters", {}).get("include_keywords", [])
-    exclude = cfg.get("filters", {}).get("exclude_keywords", [])
+    def _dispatch():
+        try:
+            run_tasks(
+                [(label, _pump(i, label, fn)) for i, (label, fn) in enumerate(sources)],
+                max_workers=ccfg.get("max_workers", 8),
+                task_timeout=ccfg.get("source_timeout_s", 200),
+                deadline=ccfg.get("deadline_s", 300),
+                on_error=lambda label, e: logger.warning(f"Source {label} abandoned: {e}"),
+            )
+        finally:
+            _put(_DONE)
 
-    uniq = {}
-    results = []
-    for it in items:
-        title = clean_text(it.get("title", ""))
-        text = " ".join(
-            [title, clean_text(it.get("summary", "")), clean_text(it.get("content", ""))]
-        )
-        if not title or not is_relevant(text, include, exclude):
-            continue
+    threading.Thread(target=_dispatch, name="collect", daemon=True).start()
+    try:
+        while True:
+            entry = q.get()
+            if entry is _DONE:
+                return
+            yield entry
+    finally:
+        closed.set()
 
-        it["id"] = compute_id(it)
-        if it["id"] in uniq:
-            continue
-        uniq[it["id"]] = True
 
-        it["score"] = basic_score(it)
-        results.append(it)
+@trace.traced(cat="stage")
+def collect_items(cfg, logger):
+    """
+    Fetch from vendor + retail tech sources defined in config.yaml into one list,
+    merged in config order, not completion order. The pipeline itself streams
+    (see stream_items / filter_rank); this is for callers that want everything.
+    """
+    return [it for _, it in sorted(stream_items(cfg, logger), key=lambda entry: entry[0])]
+
+
+def _ordered(items):
+    """Accept stream_items() pairs or plain items (ordered by position)."""
+    for n, it in enumerate(items):
+        yield it if isinstance(it, tuple) else ((0, n), it)
+
 
-    results.sort(key=lambda x: x.get("score", 0.0), reverse=True)
-    return results[:30]
+def _batches(iterable, size):
+    batch = []
+    for x in iterable:
+        batch.append(x)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+@trace.traced(cat="stage")
+def filter_rank(items, cfg, store=None, since=None, counts=None):
+    """
+    Keyword filter + dedupe + ranking over a stream of items.
+
+    items: any iterable of items or stream_items() pairs. Each item is filtered
+           and deduped on arrival, prescored, and offered to a bounded heap of
+           `ranking.pool_size` candidates, so only the pool is held to the end.
+           Thin candidates are enriched from their article pages (see
+           src.process.enrich), then the pool is scored in one vectorised
+           pass and returned best first; the report's top list is the first
+           `ranking.top_k`. When all relevant items fit in the pool (and none
+           needed enriching) this is exactly the old full ranking.
+    store: optional ItemStore; unchanged items reuse their stored keyword decision
+           and every new decision is recorded.
+    since: with a store, keep only items new or changed at/after this timestamp
+           (the --since-last-run mode).
+    counts: optional dict; its sources_checked / citations are incremented
+           for every item seen.
+    """
+    include = cfg.get("filters", {}).get("include_keywords", [])
+    exclude = cfg.get("filters", {}).get("exclude_keywords", [])
+    mode = cfg.get("filters", {}).get("match_mode", "substring")
+    filter_sig = cache.key_for(include, exclude, mode)
+
+    from src.process.rank_engine import prescorer, score_items
+    rcfg = cfg.get("ranking", {})
+    top_k = rcfg.get("top_k", 30)
+    pool = TopK(max(top_k, rcfg.get("pool_size") or 4 * top_k))
+    now = datetime.now(timezone.utc)
+    prescore = prescorer(cfg, now=now)
+    if counts is None:
+        counts = {}
+    counts.setdefault("sources_checked", 0)
+    counts.setdefault("citations", 0)
+
+    kept_order = {}   # id -> order of the copy we kept (first in config order wins)
+    fresh = {}        # id -> matched keywords, for relevant items decided this run
+    decisions = []
+    reused = observed = n_new = 0
+    for batch in _batches(_ordered(items), 256):
+        titled = []
+        for order, it in batch:
+            counts["sources_checked"] += 1
+            counts["citations"] += len(it.get("citations") or [])
+            if not clean_text(it.get("title", "")):
+                continue
+            it["id"] = compute_id(it)
+            titled.append((order, it))
+        history = store.observe([it for _, it in titled]) if store else {}
+        observed += len(history)
+        n_new += sum(1 for h in history.values() if h["status"] != "seen")
+
+        for order, it in titled:
+            prev = history.get(it["id"])
+            if since is not None and prev and prev["changed_at"] < since:
+                continue
+            if prev and prev["filter_sig"] == filter_sig and prev["relevant"] is not None:
+                matched = prev["matched"] if prev["relevant"] else None
+                is_fresh = False
+                reused += 1
+            else:
+                matched = match_keywords(it, include, exclude, mode)
+                is_fresh = True
+            if matched is None:
+                if is_fresh:
+                    decisions.append((it["id"], filter_sig, False, [], None))
+                continue
+            it["matched_keywords"] = matched
+
+            if it["id"] in kept_order and kept_order[it["id"]] <= order:
+                continue
+            kept_order[it["id"]] = order
+
+            if is_fresh:
+                fresh[it["id"]] = matched
+            pool.push(it["id"], prescore(it), order, it)
+
+        if store and decisions:
+            store.record_decisions(decisions)
+            decisions = []
+
+    candidates = pool.items()
+    if cfg.get("enrich", {}).get("enabled", True):
+        # Scraped links arrive with no summary/content; fetch their article text so
+        # the final score (and later the LLM) has something to work with
+        from src.process.enrich import enrich_items
+        with trace.span("enrich", cat="collect") as sp:
+            n = enrich_items(candidates, cfg)
+            sp.set(items=n)
+        if n:
+            print(f"[Enrich] {n} thin items filled from their article pages")
+
+    # One vectorised pass over the pool: BM25 + recency + source weight + citations (see rank_engine)
+    scored = score_items(candidates, cfg, now=now)
+    for it in scored:
+        if it["id"] in fresh:
+            decisions.append((it["id"], filter_sig, True, fresh.pop(it["id"]), it["score"]))
+    # Relevant items that never made the pool keep their keyword decision, unscored
+    decisions.extend((iid, filter_sig, True, matched, None) for iid, matched in fresh.items())
+
+    if store and decisions:
+        store.record_decisions(decisions)
+    if store:
+        print(f"[Store] {n_new} new/changed of {observed} items; {reused} filter decisions reused")
+
+    return scored
 # --- Executive section shaping (keeps CEOs happy) ----------------------------
 def _enforce_exec_shape(paras):
     """
@@ -325,7 +541,8 @@ def _enforce_consulting_shape(paras):
 
 
 def _now_ist_str() -> str:
-    return datetime.now(timezone(timedelta(hours=5, minutes=30))).strftime("%Y-%m-%d %H:%M:%S (Asia/Kolkata)")
+    # Date only: the prompts embed it, and the LLM cache key is built from the prompts
+    return datetime.now(timezone(timedelta(hours=5, minutes=30))).strftime("%Y-%m-%d (Asia/Kolkata)")
 
 today_ist = _now_ist_str()
 
@@ -341,9 +558,33 @@ def _safe_llm_lines(llm_obj, system_prompt: str, user_prompt: str, model_id: str
     lines = [ln.strip() for ln in (text or "").split("\n") if ln.strip()]
     return lines[:200]  # hard cap to avoid pathological outputs
 
+
+def _run_audience_llm(llm_obj, system_prompt: str, jobs, cfg) -> list[list[str]]:
+    """
+    Run the per-audience LLM calls concurrently. jobs: [(label, user_prompt, model_id)].
+    Returns line lists in job order; a failed or timed-out call yields [] (same as _safe_llm_lines).
+    """
+    scfg = cfg.get("summarization", {})
+    return run_tasks(
+        [(label, lambda p=prompt, m=model_id, l=label: _safe_llm_lines(llm_obj, system_prompt, p, m, l))
+         for label, prompt, model_id in jobs],
+        max_workers=scfg.get("concurrency", 3),
+        task_timeout=scfg.get("call_timeout_s", 90),
+        on_error=lambda label, e: print(f"[ERROR] LLM ({label}) failed: {e}"),
+        default=[],
+    )
+
 #def make_sections_for_pdfs(items, cfg, exec_llm=None, cons_llm=None, li_llm=None):
 #def make_sections_for_pdfs(llm, items, cfg, models_exec, models_cons, models_li):
-def make_sections_for_pdfs(llm, items, cfg, models):
+@trace.traced(cat="stage")
+def make_sections_for_pdfs(llm, items, cfg, models, meta=None, fed_ids=None):
+    """
+    meta: optional dict (the QA meta) that receives per-audience prompt packing stats.
+    fed_ids: optional set that receives the ids of the items packed into any prompt.
+    """
+    from src.process.neardup import collapse_near_duplicates
+    from src.llm.packer import pack_items, budget_for, estimate_tokens
+    from src.utils.links import build_link_index
     #exec_llm = exec_llm or []
     #cons_llm = cons_llm or []
     #li_llm   = li_llm   or []
@@ -358,25 +599,40 @@ def make_sections_for_pdfs(llm, items, cfg, models):
     items_ranked = rank_items(items)
     items_ranked_or_deduped = dedupe_items(items_ranked)
 
-    #items_compact = _compact_items_for_llm(items_ranked_or_deduped)  # use your list
-    #items_ul = _ultralight_items_for_linkedin(items_ranked_or_deduped)
+    # Highest-ranked first; unscored items keep their order after the scored ones
+    items = sorted(items, key=lambda it: it.get("score", float("-inf")), reverse=True)
 
-    # Items already ranked/deduped BEFORE calling this function OR passed as-is.
-    items_compact = _compact_items_for_llm(items)
-    items_ul = _ultralight_items_for_linkedin(items)
+    # Collapse syndicated copies (vendor post + Reddit thread + Perplexity cite) into one item;
+    # each cluster keeps its best-ranked member
+    dcfg = cfg.get("dedupe", {})
+    if dcfg.get("near_duplicates", True):
+        before = len(items)
+        items = collapse_near_duplicates(items, max_hamming=dcfg.get("max_hamming", 3))
+        if len(items) < before:
+            print(f"[Dedupe] collapsed {before - len(items)} near-duplicate items")
 
-    # Always compute IST timestamp
-    from datetime import datetime, timezone, timedelta
-    today_ist = datetime.now(timezone(timedelta(hours=5, minutes=30))).strftime(
-    "%Y-%m-%d %H:%M:%S (Asia/Kolkata)"
-    )
-    #today_ist = qa_meta.get("timestamp") if "qa_meta" in locals() else ""
+    # Always compute the IST date (not the time, so same-day reruns hit the LLM cache)
+    today_ist = _now_ist_str()
     product_focus = cfg.get("product_focus", "ecommerce search relevance")
     topics_csv = ", ".join(cfg.get("topics", []))
     denylist_domains_csv = ",".join(cfg.get("links", {}).get("denylist", []))
     recency_days_exec = cfg.get("links", {}).get("recency_days", {}).get("executive", 21)
     recency_days_cons = cfg.get("links", {}).get("recency_days", {}).get("consulting", 28)
     recency_days_li   = cfg.get("links", {}).get("recency_days", {}).get("linkedin", 21)
+    author_name  = cfg.get("branding", {}).get("author_name", "Your Name")
+    author_title = cfg.get("branding", {}).get("author_title", "Principal Architect")
+
+    prompt_vars = dict(
+        today_ist=today_ist,
+        product_focus=product_focus,
+        topics_csv=topics_csv,
+        recency_days_exec=recency_days_exec,
+        recency_days_cons=recency_days_cons,
+        recency_days_li=recency_days_li,
+        denylist_domains_csv=denylist_domains_csv,
+        author_name=author_name,
+        author_title=author_title,
+    )
 
     # system prompt (single source of truth)
     try:
@@ -386,6 +642,17 @@ def make_sections_for_pdfs(llm, items, cfg, models):
             "You are Search Intel Agent, generating Executive, Consulting and LinkedIn content. "
             "Be concise, recent-first, KPI-oriented. Avoid competitor links in public content."
         )
+    system_prompt = _render_prompt(system_prompt, **prompt_vars)
+
+    # Fill each prompt with the best-ranked items that fit the model's token budget
+    packing = {}
+    def _packed_json(label, template, model_id, shape):
+        overhead = estimate_tokens(system_prompt) + estimate_tokens(template)
+        packed, stats = pack_items(items, budget_for(cfg, model_id) - overhead, shape)
+        packing[label] = stats
+        if fed_ids is not None:  # packing takes a ranked prefix
+            fed_ids.update(it["id"] for it in items[:stats["packed"]] if it.get("id"))
+        return json.dumps(packed, ensure_ascii=False)
 
     # EXECUTIVE
     try:
@@ -400,19 +667,8 @@ def make_sections_for_pdfs(llm, items, cfg, models):
             "and end each section with 'Leadership takeaway: ...'."
         )
 
-    exec_prompt = user_exec.format(
-        today_ist=today_ist,
-        product_focus=product_focus,
-        topics_csv=topics_csv,
-        recency_days_exec=recency_days_exec,
-        denylist_domains_csv=denylist_domains_csv,
-        items_json_compact=json.dumps(items_compact, ensure_ascii=False),
-    )
-   
-    
-    
-    exec_llm = _safe_llm_lines(llm, system_prompt, exec_prompt, models["executive"], "executive")
-
+    exec_json = _packed_json("executive", user_exec, models["executive"], _compact_item)
+    exec_prompt = _render_prompt(user_exec, items_json_compact=exec_json, items_json=exec_json, **prompt_vars)
 
     # CONSULTING
     try:
@@ -427,17 +683,9 @@ def make_sections_for_pdfs(llm, items, cfg, models):
             "Client-Winning Use Cases + Action Checklist. KPIs where possible."
         )
 
-    cons_prompt = user_cons.format(
-        today_ist=today_ist,
-        product_focus=product_focus,
-        topics_csv=topics_csv,
-        recency_days_cons=recency_days_cons,
-        denylist_domains_csv=denylist_domains_csv,
-        items_json_compact=json.dumps(items_compact, ensure_ascii=False),
-    )
-    
-    cons_llm = _safe_llm_lines(llm, system_prompt, cons_prompt, models["consulting"], "consulting")
-    
+    cons_json = _packed_json("consulting", user_cons, models["consulting"], _compact_item)
+    cons_prompt = _render_prompt(user_cons, items_json_compact=cons_json, items_json=cons_json, **prompt_vars)
+
     # LINKEDIN
     try:
         user_li = load_prompt("user_linkedin.txt")
@@ -451,28 +699,28 @@ def make_sections_for_pdfs(llm, items, cfg, models):
             "one question, and a sign-off '— Curated by {author_name}, {author_title}'."
         )
 
-    author_name  = cfg.get("branding", {}).get("author_name", "Your Name")
-    author_title = cfg.get("branding", {}).get("author_title", "Principal Architect")
+    li_json = _packed_json("linkedin", user_li, models["linkedin"], _ultralight_item)
+    li_prompt = _render_prompt(user_li, items_json_ultralight=li_json, items_json=li_json, **prompt_vars)
 
-    li_prompt = user_li.format(
-        today_ist=today_ist,
-        product_focus=product_focus,
-        topics_csv=topics_csv,
-        recency_days_li=recency_days_li,
-        denylist_domains_csv=denylist_domains_csv,
-        items_json_ultralight=json.dumps(items_ul, ensure_ascii=False),
-        author_name=author_name,
-        author_title=author_title,
-    )
-   
-    li_llm = _safe_llm_lines(llm, system_prompt, li_prompt, models["linkedin"], "linkedin")
+    print("[LLM] prompt packing:", packing)
+    if meta is not None:
+        meta["prompt_packing"] = packing
+
+    # All three audiences are independent: one round-trip of wall-clock instead of three
+    exec_llm, cons_llm, li_llm = _run_audience_llm(llm, system_prompt, [
+        ("executive", exec_prompt, models["executive"]),
+        ("consulting", cons_prompt, models["consulting"]),
+        ("linkedin", li_prompt, models["linkedin"]),
+    ], cfg)
 
     li_llm = enforce_length(li_llm)
 
 
-    # 1) Build pool
-    all_links = dedupe_links(extract_links_from_items(items))
-    all_links = sort_links_by_date_desc(all_links)
+    # 1) Build pool (hosts, dates and flags parsed once)
+    with trace.span("build_link_index", cat="links") as sp:
+        link_index = build_link_index(items)
+        sp.set(links=len(link_index))
+    now = datetime.now(timezone.utc)
 
     # 2) Recency config
     recency_days_exec = _cfg_links(cfg, "recency_days", {}).get("executive", 21)
@@ -485,14 +733,11 @@ def make_sections_for_pdfs(llm, items, cfg, models):
 
     allow_undated = bool(_cfg_links(cfg, "allow_undated_backfill", True))
 
-    # 3) Audience filters + recency
-    exec_links = filter_by_recency(filter_exec(all_links), recency_days_exec, allow_undated, min_exec)
-    cons_links = filter_by_recency(filter_cons(all_links), recency_days_cons, allow_undated, min_cons)
-    li_links   = filter_by_recency(filter_li(all_links), recency_days_li, allow_undated, min_li)
-
-    exec_links = pick_top(exec_links, 8)
-    cons_links = pick_top(cons_links, 10)
-    li_links   = pick_top(li_links, 6)
+    # 3) Audience filters + recency, one pass each against the same "now"
+    with trace.span("select_links", cat="links"):
+        exec_links = link_index.select(True, recency_days_exec, allow_undated, min_exec, 8, now)
+        cons_links = link_index.select(False, recency_days_cons, allow_undated, min_cons, 10, now)
+        li_links   = link_index.select(True, recency_days_li, allow_undated, min_li, 6, now)
 
     # 4) Format titles with date suffix (e.g., "Title (25 Aug 2025)")
     def _add_date_suffix(lns):
@@ -557,10 +802,20 @@ def main():
     parser.add_argument("--simulate", action="store_true")
     parser.add_argument("--schedule", action="store_true")
     parser.add_argument("--cron", action="store_true")
+    parser.add_argument("--no-llm-cache", action="store_true",
+                        help="ignore and don't write the persistent LLM response cache")
+    parser.add_argument("--since-last-run", action="store_true",
+                        help="only process items that are new or changed since the last finished run")
+    parser.add_argument("--trace", action="store_true",
+                        help="record per-stage spans; writes JSONL + Chrome trace to the output dir")
     args = parser.parse_args()
 
     cfg = load_config("config.yaml")
     logger = get_logger()
+    http.configure(cfg)
+    cache.configure(cfg)
+    resilience.configure(cfg)
+    trace.configure(cfg, force=args.trace)
 
     # Schedule guard (your existing logic)
     if args.schedule or args.cron:
@@ -568,22 +823,42 @@ def main():
             print("Not the bi-weekly slot — exiting.")
             return
 
+    now_ts = datetime.now(timezone.utc).timestamp()
+    open_hosts = sorted(h for h, st in resilience.breakers.snapshot().items() if (st.get("open_until") or 0) > now_ts)
+    if open_hosts:
+        print(f"[Breaker] skipping hosts with open circuits: {', '.join(open_hosts)}")
+
+    # Cross-run item history (optional)
+    from src.process.item_store import ItemStore
+    store = ItemStore.from_config(cfg)
+    run_id, last_run_finished = store.begin_run() if store else (None, None)
+    since = last_run_finished if args.since_last_run else None
+    if args.since_last_run and since is None:
+        print("[Store] No finished previous run — processing everything.")
+
     # Collect + filter
-    items = collect_items(cfg, logger)
-    ranked = filter_rank(items, cfg)
+    # Collectors stream straight into the filter; only the ranked pool is kept
+    counts = {"sources_checked": 0, "items_kept": 0, "citations": 0}
+    items = filter_rank(stream_items(cfg, logger), cfg, store=store, since=since, counts=counts)
+    ranked = items[:cfg.get("ranking", {}).get("top_k", 30)]
 
     # ---- QA meta (unchanged) ----
-    counts = {
-        "sources_checked": len(items),
-        "items_kept": len(ranked),
-        "citations": sum(len(it.get("citations") or []) for it in items),
-    }
-    qa_meta = collect_run_meta(cfg, counts)
+    counts["items_kept"] = len(ranked)
+    from src.ingest.rss import feed_cache_stats
+    from src.collectors.github import github_cache_stats
+    from src.ingest.scrape import scrape_cache_stats
+    from src.process.enrich import enrich_cache_stats
+    qa_meta = collect_run_meta(cfg, counts, caches={
+        "feeds": feed_cache_stats(), "pages": scrape_cache_stats(),
+        "github": github_cache_stats(), "articles": enrich_cache_stats(),
+    })
     print("[QA] Meta:", qa_meta)
 
     # ---- LLM prep: instantiate provider and compute LLM outputs (BEFORE sections) ----
     from src.llm.provider import LLMProvider
-    llm = LLMProvider()
+    from src.llm.cache import LLMCache
+    llm_cache = None if args.no_llm_cache else LLMCache.from_config(cfg)
+    llm = LLMProvider(cache=llm_cache)
 
     # Resolve model ids (cfg → env → defaults)
     cfg_models = (cfg or {}).get("models", {})
@@ -595,8 +870,6 @@ def main():
 
     exec_llm, cons_llm, li_llm = [], [], []
     if cfg.get("summarization", {}).get("use_llm", False):
-        from src.llm.provider import LLMProvider
-        llm = LLMProvider()
         try:
             from src.process.llm_summarize import summarize_items_llm
             exec_llm = summarize_items_llm(ranked, "executive", llm=llm)
@@ -631,9 +904,13 @@ def main():
     #    llm, items, cfg, models_exec, models_cons, models_li
     #)
    
+    fed_ids = set()
     exec_sections, consulting_sections, linkedin_sections = make_sections_for_pdfs(
-         llm, items, cfg, models
+         llm, items, cfg, models, meta=qa_meta, fed_ids=fed_ids
     )
+    if llm_cache is not None:
+        qa_meta["caches"]["llm"] = llm_cache.stats.as_dict()
+        print("[QA] LLM cache:", qa_meta["caches"]["llm"])
     # OPTIONAL: inline QA markers for visual confirmation
    
     if exec_llm:
@@ -645,11 +922,9 @@ def main():
 
 
     # ---- Output paths (unchanged) ----
+    from src.output.render import report_jobs, render_pdfs, reuse_unchanged, save_manifest
     out_dir = ensure_out_dir(cfg)
     ts = datetime.now().strftime("%Y%m%d_%H%M")
-    exec_pdf = os.path.join(out_dir, f"Executive_Insights_{ts}.pdf")
-    cons_pdf = os.path.join(out_dir, f"Consulting_News_{ts}.pdf")
-    li_pdf   = os.path.join(out_dir, f"LinkedIn_Kit_{ts}.pdf")
 
     brand = cfg.get("output", {}).get("pdf_brand", {})
     title = brand.get("title", "Search Intel - Bi-Weekly")  # ASCII hyphen
@@ -658,14 +933,51 @@ def main():
     # ---- Generate PDFs (pass qa=qa_meta) ----
     accent = (52, 152, 219)  # nice blue; RGB tuple
 
-    make_pdf(exec_pdf, f"{title} - Executive Insights",   accent, exec_sections, qa=qa_meta)
-    make_pdf(cons_pdf,  f"{title} - Consulting News",     accent, consulting_sections, qa=qa_meta)
-    make_pdf(li_pdf,    f"{title} - LinkedIn Draft Kit",  accent, linkedin_sections, qa=qa_meta)
+    if trace.is_enabled():
+        qa_meta["timings"] = trace.summary()
+    jobs = report_jobs(out_dir, ts, title, accent, [
+        ("Executive_Insights", "Executive Insights", exec_sections),
+        ("Consulting_News",    "Consulting News",    consulting_sections),
+        ("LinkedIn_Kit",       "LinkedIn Draft Kit", linkedin_sections),
+    ], qa=qa_meta)
+    rcfg = cfg.get("output", {}).get("render", {}) or {}
+    reused = reuse_unchanged(jobs, out_dir) if rcfg.get("reuse_unchanged", True) else {}
+    for path, src in reused.items():
+        print(f"[Render] {os.path.basename(path)}: unchanged, reused {os.path.basename(src)}")
+    timings = render_pdfs([j for j in jobs if j["path"] not in reused],
+                          max_workers=rcfg.get("max_workers"), parallel=rcfg.get("parallel", False),
+                          min_jobs=rcfg.get("min_jobs", 8))
+    save_manifest(jobs, out_dir)
+    exec_pdf, cons_pdf, li_pdf = (j["path"] for j in jobs)
+    for path, secs in timings.items():
+        print(f"[Render] {os.path.basename(path)}: {secs:.2f}s")
 
     print("Generated PDFs:", exec_pdf, cons_pdf, li_pdf)
+    if trace.is_enabled():
+        trace_base = os.path.join(out_dir, f"trace_{ts}")
+        trace.write_jsonl(trace_base + ".jsonl")
+        trace.write_chrome(trace_base + ".chrome.json")
+        print("[Trace]", trace_base + ".jsonl", trace_base + ".chrome.json")
+
+    if store:
+        store.finish_run(
+            run_id,
+            counts,
+            llm={
+                "executive": exec_sections[0]["paras"],
+                "consulting": consulting_sections[0]["paras"],
+                "linkedin": linkedin_sections[0]["paras"],
+            },
+            # everything the prompts saw (packed from the whole pool, not just top_k)
+            item_ids=sorted(fed_ids | {it["id"] for it in ranked}),
+        )
 
     # Optional email (unchanged)
-    if cfg.get("output", {}).get("email", {}).get("enabled"):
+    email_cfg = cfg.get("output", {}).get("email", {})
+    if email_cfg.get("enabled") and email_cfg.get("skip_if_unchanged") and len(reused) == len(jobs):
+        print("[Email] skipped: all reports unchanged since the last run")
+    elif email_cfg.get("enabled"):
+        from src.emailer.smtp import send_email
         subject = cfg["output"]["email"].get("subject", "Search Intel - Bi-Weekly Brief")
         body = "Attached: Executive Insights, Consulting News, and LinkedIn Draft Kit."
         to_addr = os.getenv("EMAIL_TO", os.getenv("SMTP_USERNAME"))
@@ -0,0 +1,133 @@
+# src/output/fonts.py
+from __future__ import annotations
+import copy
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+from collections import defaultdict
+from io import BytesIO
+from typing import Any, Dict
+
+import fpdf
+from fontTools import ttLib
+from fpdf.enums import TextEmphasis
+from fpdf.fonts import SubsetMap, TTFFont
+
+# Bump when the pickled layout changes; fpdf's version is part of the check too,
+# since the metrics mirror what its TTFFont.__init__ computes.
+METRICS_VERSION = 1
+
+_lock = threading.Lock()
+_loaded: Dict[str, Dict[str, Any]] = {}  # abs TTF path -> metrics + raw font bytes
+
+
+def _metrics_path(ttf_path: str) -> str:
+    return ttf_path + ".metrics.pkl"
+
+
+def _parse_metrics(ttf_path: str) -> Dict[str, Any]:
+    """Let fpdf parse the TTF once and keep the document-independent parts."""
+    font = TTFFont(fpdf.FPDF(), ttf_path, "probe", "")
+    try:
+        return {
+            "scale": font.scale,
+            "desc": font.desc,
+            "default_width": font.desc.missing_width,
+            "cw": dict(font.cw),
+            "cmap": font.cmap,
+            "glyph_ids": font.glyph_ids,
+            "name": font.name,
+            "up": font.up,
+            "ut": font.ut,
+        }
+    finally:
+        font.close()
+
+
+def _load(ttf_path: str) -> Dict[str, Any]:
+    """
+    Metrics for ttf_path: from this process's memo, else from the pickle next to
+    the TTF (valid only for the same file hash and fpdf version), else parsed
+    fresh and pickled for the next cold start.
+    """
+    path = os.path.abspath(ttf_path)
+    with _lock:
+        if path in _loaded:
+            return _loaded[path]
+
+        with open(path, "rb") as f:
+            raw = f.read()
+        sha = hashlib.sha256(raw).hexdigest()
+        stamp = (METRICS_VERSION, fpdf.__version__, sha)
+
+        metrics = None
+        try:
+            with open(_metrics_path(path), "rb") as f:
+                saved = pickle.load(f)
+            if saved.get("stamp") == stamp:
+                metrics = saved["metrics"]
+        except Exception:
+            pass
+
+        if metrics is None:
+            metrics = _parse_metrics(path)
+            try:
+                fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+                with os.fdopen(fd, "wb") as f:
+                    pickle.dump({"stamp": stamp, "metrics": metrics}, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, _metrics_path(path))
+            except OSError:
+                pass  # read-only checkout: still cached for this process
+
+        entry = dict(metrics, raw=raw)
+        cw = defaultdict(lambda: entry["default_width"])
+        cw.update(entry["cw"])
+        entry["cw"] = cw
+        _loaded[path] = entry
+        return entry
+
+
+def add_cached_font(pdf: fpdf.FPDF, family: str, style: str, ttf_path: str) -> None:
+    """
+    Drop-in for pdf.add_font(family, style, ttf_path) that skips re-parsing the
+    TTF tables. Glyph metrics are shared; the per-document parts (font index,
+    subset map, fontTools handle that output() subsets in place) are fresh.
+    """
+    style = "".join(sorted(style.upper()))
+    fontkey = f"{family.lower()}{style}"
+    if fontkey in pdf.fonts:
+        return
+    try:
+        pdf.fonts[fontkey] = _build_font(pdf, fontkey, style, ttf_path)
+    except (AttributeError, TypeError, KeyError):
+        # fpdf internals moved under us: take the slow, supported path
+        pdf.add_font(family, style, ttf_path)
+
+
+def _build_font(pdf: fpdf.FPDF, fontkey: str, style: str, ttf_path: str) -> TTFFont:
+    m = _load(ttf_path)
+    font = TTFFont.__new__(TTFFont)
+    font.i = len(pdf.fonts) + 1
+    font.type = "TTF"
+    font.ttffile = os.path.abspath(ttf_path)
+    font.fontkey = fontkey
+    font.ttfont = ttLib.TTFont(BytesIO(m["raw"]), recalcTimestamp=False, fontNumber=0, lazy=True)
+    font.scale = m["scale"]
+    font.desc = copy.copy(m["desc"])  # output() stores the embedded font stream on it
+    font.cw = m["cw"]
+    font.cmap = m["cmap"]
+    font.glyph_ids = m["glyph_ids"]
+    font.hbfont = None
+    font.missing_glyphs = []
+    font.name = m["name"]
+    font.up = m["up"]
+    font.ut = m["ut"]
+    font.emphasis = TextEmphasis.coerce(style)
+
+    sbarr = "\x00 \r\n"
+    if pdf.str_alias_nb_pages:
+        sbarr += "0123456789" + pdf.str_alias_nb_pages
+    font.subset = SubsetMap(font, [ord(ch) for ch in sbarr])
+    return font
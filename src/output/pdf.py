@@ -3,6 +3,7 @@ import os
 import textwrap
 from fpdf import FPDF
 from fpdf.enums import XPos, YPos
+from src.output.fonts import add_cached_font
 
 # Paths to TTFs you ship with the repo (recommended)
 FONT_REG_PATH = "assets/fonts/DejaVuSans.ttf"
@@ -37,12 +38,12 @@ class BrandPDF(FPDF):
         self.accent_rgb = accent_rgb
         self._has_unicode_font = False
 
-        # Try to register DejaVu fonts (Unicode)
+        # Try to register DejaVu fonts (Unicode); metrics are parsed once per process
         try:
             if os.path.exists(FONT_REG_PATH):
-                self.add_font("DejaVu", "", FONT_REG_PATH, uni=True)
+                add_cached_font(self, "DejaVu", "", FONT_REG_PATH)
                 if os.path.exists(FONT_BOLD_PATH):
-                    self.add_font("DejaVu", "B", FONT_BOLD_PATH, uni=True)
+                    add_cached_font(self, "DejaVu", "B", FONT_BOLD_PATH)
                 else:
                     # If bold TTF not present, at least regular is available
                     pass
@@ -0,0 +1,124 @@
+# src/output/render.py
+from __future__ import annotations
+import multiprocessing
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.output.pdf import make_pdf
+from src.utils import trace
+from src.utils.cache import key_for, read_json, write_json
+
+MANIFEST = ".render_manifest.json"
+# Bump when make_pdf's layout changes, so older outputs aren't reused
+RENDER_VERSION = 1
+# QA fields that change every run without changing what the report says
+VOLATILE_QA = ("timestamp", "caches", "timings")
+
+
+def report_jobs(out_dir: str, ts: str, title: str, accent: Tuple[int, int, int],
+                sections_by_doc: List[Tuple[str, str, List[Dict[str, Any]]]],
+                qa: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """
+    One render job per document. Paths are fixed here, before any work starts,
+    as <out_dir>/<stem>_<ts>.pdf, so output never depends on completion order.
+    sections_by_doc: [(file_stem, title_suffix, sections)]
+    """
+    return [
+        {
+            "doc": stem,
+            "path": os.path.join(out_dir, f"{stem}_{ts}.pdf"),
+            "title": f"{title} - {suffix}",
+            "accent": accent,
+            "sections": sections,
+            "qa": qa,
+        }
+        for stem, suffix, sections in sections_by_doc
+    ]
+
+
+def job_digest(job: Dict[str, Any]) -> str:
+    """Hash of everything that ends up on the page, minus VOLATILE_QA."""
+    qa = {k: v for k, v in (job.get("qa") or {}).items() if k not in VOLATILE_QA}
+    return key_for(RENDER_VERSION, job["title"], list(job["accent"]), job["sections"], qa)
+
+
+def reuse_unchanged(jobs: List[Dict[str, Any]], out_dir: str) -> Dict[str, str]:
+    """
+    For every job whose digest matches the last render of the same document
+    (per the manifest in out_dir), hardlink -- or copy, across filesystems --
+    the previous PDF to the job's path. Returns {path: previous_path}; those
+    jobs need no rendering. Sets job["digest"] on every job.
+    """
+    manifest = read_json(os.path.join(out_dir, MANIFEST)) or {}
+    reused: Dict[str, str] = {}
+    for job in jobs:
+        job["digest"] = job_digest(job)
+        prev = manifest.get(job["doc"]) or {}
+        src = prev.get("path")
+        if prev.get("digest") != job["digest"] or not src or not os.path.exists(src):
+            continue
+        if os.path.abspath(src) != os.path.abspath(job["path"]):
+            try:
+                if os.path.exists(job["path"]):
+                    os.remove(job["path"])
+                os.link(src, job["path"])
+            except OSError:
+                shutil.copy2(src, job["path"])
+        reused[job["path"]] = src
+    return reused
+
+
+def save_manifest(jobs: List[Dict[str, Any]], out_dir: str) -> None:
+    """Record digest + path per document once its PDF exists."""
+    path = os.path.join(out_dir, MANIFEST)
+    manifest = read_json(path) or {}
+    for job in jobs:
+        if os.path.exists(job["path"]):
+            manifest[job["doc"]] = {"digest": job.get("digest") or job_digest(job), "path": job["path"]}
+    write_json(path, manifest)
+
+
+def _render_one(job: Dict[str, Any]) -> Tuple[float, float, int]:
+    """Returns (wall-clock start, seconds, pid) so the parent can trace pool renders."""
+    wall, t0 = time.time(), time.perf_counter()
+    if os.path.exists(job["path"]):
+        os.remove(job["path"])  # may be a hardlink to an earlier report; don't write through it
+    make_pdf(job["path"], job["title"], job["accent"], job["sections"], qa=job.get("qa"))
+    return wall, time.perf_counter() - t0, os.getpid()
+
+
+def _record(job: Dict[str, Any], run: Tuple[float, float, int], timings: Dict[str, float]) -> None:
+    wall, secs, pid = run
+    timings[job["path"]] = secs
+    trace.add("make_pdf", wall, secs, cat="render", pid=pid, doc=job.get("doc"))
+
+
+def render_pdfs(jobs: List[Dict[str, Any]], max_workers: Optional[int] = None,
+                parallel: bool = False, min_jobs: int = 8) -> Dict[str, float]:
+    """
+    Render jobs (from report_jobs) and return {path: seconds}. In-process by
+    default: each spawned worker pays ~0.4s to start and import fpdf/fontTools,
+    more than a whole report takes (~0.13s), so the three regular reports are
+    always faster serially. With parallel on and at least min_jobs jobs, they go
+    to a process pool, one document per worker (layout is CPU-bound, so threads
+    wouldn't help); if the pool can't be used, rendering falls back to serial.
+    """
+    timings: Dict[str, float] = {}
+    workers = min(len(jobs), max_workers or os.cpu_count() or 1)
+    if parallel and workers > 1 and len(jobs) >= min_jobs:
+        try:
+            # spawn: the parent holds live HTTP/SQLite threads, which fork would copy mid-state
+            ctx = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+                for job, run in zip(jobs, pool.map(_render_one, jobs)):
+                    _record(job, run, timings)
+            return timings
+        except Exception as e:
+            print(f"[Render] process pool unavailable ({e}); rendering serially")
+            timings.clear()
+    for job in jobs:
+        _record(job, _render_one(job), timings)
+    return timings
@@ -0,0 +1,213 @@
+# src/process/enrich.py
+from __future__ import annotations
+import hashlib
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+from src.process.summarize import summarize_text
+from src.utils import http
+from src.utils.cache import cache_path, key_for, read_json, write_json, CacheStats
+from src.utils.parallel import run_tasks
+
+# Bump when extraction changes so cached article text is re-parsed.
+ENRICH_CACHE_VERSION = 1
+
+DEFAULTS: Dict[str, Any] = {
+    "max_items": 40,         # thin candidates enriched per run, best first
+    "min_chars": 80,         # summary/content shorter than this counts as thin
+    "max_workers": 8,
+    "per_host": 2,           # concurrent requests to one host
+    "host_interval_s": 0.5,  # min gap between request starts to one host
+    "timeout_s": 15,
+    "max_age_days": 30,      # re-fetch a cached URL after this long
+    "summary_sentences": 3,
+    "content_chars": 4000,   # article text kept on the item (BM25 reads the first 2000)
+    # API collectors: their text comes from the API, and their hosts' HTML pages
+    # answer a browser UA with 403/429 (tripping the breakers the APIs share)
+    "skip_sources": ["Reddit", "GitHub", "Perplexity"],
+}
+
+UA = {"User-Agent": "Mozilla/5.0 (SearchIntel/1.0)"}
+_DROP = ("script", "style", "noscript", "nav", "header", "footer", "aside", "form")
+_WS = re.compile(r"\s+")
+
+_stats = CacheStats()
+
+
+def enrich_cache_stats():
+    """Hits = article text reused from the URL or content-hash cache; misses = fetched + parsed."""
+    return _stats.as_dict()
+
+
+def _clean(text: str) -> str:
+    return _WS.sub(" ", text or "").strip()
+
+
+def is_thin(it: Dict[str, Any], min_chars: int) -> bool:
+    return len(_clean(it.get("summary"))) < min_chars and len(_clean(it.get("content"))) < min_chars
+
+
+def _main_paragraphs(paras) -> List[str]:
+    """
+    paras: [(parent key, text)]. Main-content heuristic: the container whose
+    <p> children hold the most text (nav/footer/sidebars are already dropped).
+    """
+    totals: Dict[Any, int] = {}
+    for parent, text in paras:
+        totals[parent] = totals.get(parent, 0) + len(text)
+    if not totals:
+        return []
+    best = max(totals, key=totals.get)
+    return [text for parent, text in paras if parent == best]
+
+
+def _extract_lxml(html: bytes) -> str:
+    import lxml.html
+
+    doc = lxml.html.fromstring(html)
+    for el in doc.xpath("|".join(f"//{tag}" for tag in _DROP)):
+        el.drop_tree()
+    root = next(iter(doc.xpath("//article") or doc.xpath("//main") or doc.xpath('//*[@role="main"]')), None)
+    if root is not None:
+        texts = [_clean(p.text_content()) for p in root.xpath(".//p")]
+    else:
+        texts = _main_paragraphs([(p.getparent(), _clean(p.text_content())) for p in doc.xpath("//p")])
+    texts = [t for t in texts if t]
+    return "\n".join(texts) if texts else _clean((root if root is not None else doc).text_content())
+
+
+def _extract_bs4(html: bytes) -> str:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    for el in soup.find_all(list(_DROP)):
+        el.decompose()
+    root = soup.find("article") or soup.find("main") or soup.find(attrs={"role": "main"})
+    if root is not None:
+        texts = [_clean(p.get_text(" ")) for p in root.find_all("p")]
+    else:
+        texts = _main_paragraphs([(id(p.parent), _clean(p.get_text(" "))) for p in soup.find_all("p")])
+    texts = [t for t in texts if t]
+    return "\n".join(texts) if texts else _clean((root or soup).get_text(" "))
+
+
+def extract_main_text(html: bytes) -> str:
+    """Main article text from an HTML page: lxml when installed, else BeautifulSoup."""
+    try:
+        import lxml.html  # noqa: F401  (pip install lxml)
+    except ImportError:
+        return _extract_bs4(html)
+    return _extract_lxml(html)
+
+
+class _HostGate:
+    """
+    Per-host politeness: at most `per_host` requests in flight to one host,
+    and request starts at least `interval_s` apart.
+    """
+
+    def __init__(self, per_host: int, interval_s: float):
+        self.per_host = max(1, int(per_host))
+        self.interval_s = float(interval_s)
+        self._hosts: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, host: str):
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = [threading.Semaphore(self.per_host), threading.Lock(), 0.0]
+            return _HostSlot(self, self._hosts[host])
+
+
+class _HostSlot:
+    def __init__(self, gate: _HostGate, state: list):
+        self.gate, self.state = gate, state
+
+    def __enter__(self):
+        sem, lock, _ = self.state
+        sem.acquire()
+        with lock:
+            delay = self.state[2] + self.gate.interval_s - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self.state[2] = time.monotonic()
+        return self
+
+    def __exit__(self, *exc):
+        self.state[0].release()
+        return False
+
+
+def _article(url: str, gate: _HostGate, ecfg: Dict[str, Any]) -> Optional[Dict[str, str]]:
+    """
+    {"summary", "content"} for one URL. The URL cache says which body hash the
+    URL last had; the hash cache holds the extracted text, so each article is
+    fetched once (until max_age_days) and each distinct body parsed once.
+    """
+    url_path = cache_path("articles", "url", key_for(url) + ".json")
+    entry = read_json(url_path)
+    fresh = entry and entry.get("v") == ENRICH_CACHE_VERSION and \
+        time.time() - entry.get("fetched_at", 0) < float(ecfg["max_age_days"]) * 86400
+    if fresh:
+        parsed = read_json(cache_path("articles", "body", entry["sha256"] + ".json"))
+        if parsed:
+            _stats.hit()
+            return parsed
+
+    with gate(urlparse(url).netloc.lower()):
+        r = http.get(url, headers=UA, timeout=float(ecfg["timeout_s"]))
+    r.raise_for_status()
+    if "html" not in r.headers.get("content-type", "html"):
+        return None
+    body_hash = hashlib.sha256(r.content).hexdigest()
+    body_path = cache_path("articles", "body", body_hash + ".json")
+    parsed = read_json(body_path)
+    if parsed and parsed.get("v") == ENRICH_CACHE_VERSION:
+        _stats.hit()
+    else:
+        _stats.miss()
+        text = extract_main_text(r.content)
+        parsed = {
+            "v": ENRICH_CACHE_VERSION,
+            "summary": summarize_text(text, int(ecfg["summary_sentences"])),
+            "content": text[:int(ecfg["content_chars"])],
+        }
+        write_json(body_path, parsed)
+    write_json(url_path, {"v": ENRICH_CACHE_VERSION, "url": url, "sha256": body_hash, "fetched_at": time.time()})
+    return parsed
+
+
+def enrich_items(items: List[Dict[str, Any]], cfg: Dict[str, Any]) -> int:
+    """
+    Fill summary/content for thin items (scraped links, bare feed entries)
+    from their article pages, concurrently and politely per host. Items from
+    enrich.skip_sources are left alone. Items are updated in place, best
+    first up to enrich.max_items; returns how many were enriched.
+    """
+    ecfg = {**DEFAULTS, **((cfg.get("enrich", {}) or {}))}
+    skip = set(ecfg["skip_sources"] or [])
+    thin = [
+        it for it in items
+        if it.get("source") not in skip and is_thin(it, int(ecfg["min_chars"]))
+        and (it.get("url") or "").startswith(("http://", "https://"))
+    ][:int(ecfg["max_items"])]
+    if not thin:
+        return 0
+
+    gate = _HostGate(ecfg["per_host"], ecfg["host_interval_s"])
+    results = run_tasks(
+        [(it["url"], lambda it=it: _article(it["url"], gate, ecfg)) for it in thin],
+        max_workers=int(ecfg["max_workers"]),
+        task_timeout=float(ecfg["timeout_s"]) * 2,
+        on_error=lambda url, e: print(f"[Enrich] {url}: {e}"),
+    )
+    n = 0
+    for it, parsed in zip(thin, results):
+        if parsed and parsed.get("content"):
+            it["summary"] = parsed["summary"]
+            it["content"] = parsed["content"]
+            n += 1
+    return n
@@ -1,11 +1,28 @@
 import re, hashlib
+from functools import lru_cache
+from src.process.keywords import KeywordMatcher
 def clean_text(t: str) -> str:
     import re; return re.sub(r'\s+', ' ', (t or '')).strip()
-def is_relevant(text: str, include, exclude) -> bool:
-    t = (text or '').lower()
-    if include and not any(k.lower() in t for k in include): return False
-    if exclude and any(k.lower() in t for k in exclude): return False
+@lru_cache(maxsize=64)
+def keyword_matcher(keywords: tuple, mode: str = 'substring') -> KeywordMatcher:
+    """Compiled matcher, built once per distinct keyword list."""
+    return KeywordMatcher(keywords, mode)
+def is_relevant(text: str, include, exclude, mode: str = 'substring') -> bool:
+    if include and not keyword_matcher(tuple(include), mode).search(text): return False
+    if exclude and keyword_matcher(tuple(exclude), mode).search(text): return False
     return True
+def match_keywords(item, include, exclude, mode: str = 'substring'):
+    """
+    Relevance check on an item's fields without concatenating them.
+    Returns the include keywords that matched, or None if the item is filtered out.
+    """
+    fields = [item.get('title') or '', item.get('summary') or '']
+    content = item.get('content') or ''
+    if content and content != fields[1]: fields.append(content)  # RSS copies summary into content
+    if exclude and any(keyword_matcher(tuple(exclude), mode).search(f) for f in fields): return None
+    if not include: return []
+    matched = keyword_matcher(tuple(include), mode).findall(*fields)
+    return matched or None
 def compute_id(item):
     key = f"{item.get('source','')}|{item.get('title','')}|{item.get('url','')}"
     return hashlib.sha256(key.encode('utf-8')).hexdigest()
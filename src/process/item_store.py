@@ -0,0 +1,170 @@
+# src/process/item_store.py
+from __future__ import annotations
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.utils.cache import cache_path
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS items (
+        id            TEXT PRIMARY KEY,   -- compute_id(item)
+        source        TEXT,
+        title         TEXT,
+        url           TEXT,
+        content_hash  TEXT NOT NULL,
+        first_seen    REAL NOT NULL,
+        last_seen     REAL NOT NULL,
+        last_changed  REAL NOT NULL,
+        filter_sig    TEXT,               -- filter config the decision below was made under
+        relevant      INTEGER,
+        matched       TEXT,               -- JSON list of matched include keywords
+        score         REAL,
+        last_run      INTEGER             -- last run whose LLM prompts included this item
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS runs (
+        run_id    INTEGER PRIMARY KEY AUTOINCREMENT,
+        started   REAL NOT NULL,
+        finished  REAL,
+        counts    TEXT,                   -- JSON
+        llm       TEXT                    -- JSON {audience: [paras]}
+    )
+    """,
+)
+
+_CHUNK = 500  # stay under SQLite's bound-parameter limit
+
+
+def content_hash(item: Dict[str, Any]) -> str:
+    key = "\x1f".join(str(item.get(k) or "") for k in ("title", "summary", "content", "url"))
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+class ItemStore:
+    """
+    SQLite record of every item we've seen, keyed by compute_id.
+
+    Tracks first/last seen times, content changes, the keyword-filter decision
+    and which run last sent the item to the LLM, so reruns can reuse decisions
+    and "--since-last-run" can limit a run to new or changed items.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        for stmt in _SCHEMA:
+            self._conn.execute(stmt)
+
+    @classmethod
+    def from_config(cls, cfg: Dict[str, Any]) -> Optional["ItemStore"]:
+        scfg = (cfg or {}).get("store", {}) or {}
+        if not scfg.get("enabled", True):
+            return None
+        return cls(scfg.get("path") or cache_path("items.sqlite"))
+
+    # ---- runs ----
+    def begin_run(self) -> Tuple[int, Optional[float]]:
+        """Open a run; returns (run_id, finish time of the last completed run or None)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT finished FROM runs WHERE finished IS NOT NULL ORDER BY run_id DESC LIMIT 1"
+            ).fetchone()
+            cur = self._conn.execute("INSERT INTO runs (started) VALUES (?)", (time.time(),))
+            return cur.lastrowid, (row[0] if row else None)
+
+    def finish_run(self, run_id: int, counts: Dict[str, Any],
+                   llm: Optional[Dict[str, List[str]]] = None,
+                   item_ids: Iterable[str] = ()) -> None:
+        """Close the run, store its LLM output, and stamp the items that fed it."""
+        ids = list(item_ids)
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute(
+                "UPDATE runs SET finished = ?, counts = ?, llm = ? WHERE run_id = ?",
+                (time.time(), json.dumps(counts), json.dumps(llm or {}, ensure_ascii=False), run_id),
+            )
+            self._conn.executemany("UPDATE items SET last_run = ? WHERE id = ?", [(run_id, i) for i in ids])
+            self._conn.execute("COMMIT")
+
+    # ---- items ----
+    def observe(self, items: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Upsert seen/changed timestamps for items that already carry "id".
+        Returns {id: {"status": "new"|"changed"|"seen", "changed_at": ts,
+                      "filter_sig", "relevant", "matched"}} using the state *before* this call.
+        """
+        now = time.time()
+        by_id = {it["id"]: it for it in items}
+        ids = list(by_id)
+        prior: Dict[str, tuple] = {}
+        with self._lock:
+            for i in range(0, len(ids), _CHUNK):
+                chunk = ids[i:i + _CHUNK]
+                rows = self._conn.execute(
+                    "SELECT id, content_hash, first_seen, last_changed, filter_sig, relevant, matched "
+                    f"FROM items WHERE id IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                prior.update({r[0]: r[1:] for r in rows})
+
+            out: Dict[str, Dict[str, Any]] = {}
+            upserts = []
+            for iid, it in by_id.items():
+                h = content_hash(it)
+                p = prior.get(iid)
+                if p is None:
+                    status, changed_at = "new", now
+                elif p[0] != h:
+                    status, changed_at = "changed", now
+                else:
+                    status, changed_at = "seen", max(p[1], p[2])
+                same = status == "seen"
+                out[iid] = {
+                    "status": status,
+                    "changed_at": changed_at,
+                    "filter_sig": p[3] if same else None,
+                    "relevant": p[4] if same else None,
+                    "matched": json.loads(p[5]) if same and p[5] else [],
+                }
+                upserts.append((iid, it.get("source"), it.get("title"), it.get("url"), h, now, now, now))
+
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                """
+                INSERT INTO items (id, source, title, url, content_hash, first_seen, last_seen, last_changed)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    last_seen = excluded.last_seen,
+                    last_changed = CASE WHEN items.content_hash != excluded.content_hash
+                                        THEN excluded.last_changed ELSE items.last_changed END,
+                    filter_sig = CASE WHEN items.content_hash != excluded.content_hash
+                                      THEN NULL ELSE items.filter_sig END,
+                    content_hash = excluded.content_hash,
+                    title = excluded.title,
+                    url = excluded.url
+                """,
+                upserts,
+            )
+            self._conn.execute("COMMIT")
+        return out
+
+    def record_decisions(self, decisions: List[Tuple[str, str, bool, List[str], Optional[float]]]) -> None:
+        """decisions: [(id, filter_sig, relevant, matched_keywords, score)]"""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "UPDATE items SET filter_sig = ?, relevant = ?, matched = ?, score = ? WHERE id = ?",
+                [(sig, int(rel), json.dumps(m or []), score, iid) for iid, sig, rel, m, score in decisions],
+            )
+            self._conn.execute("COMMIT")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,137 @@
+# src/process/keywords.py
+from __future__ import annotations
+import re
+from typing import Dict, Iterable, List, Optional
+
+MODES = ("substring", "word", "stem")
+
+# Light suffix stripping for "stem" mode; longest first.
+_SUFFIXES = ("ings", "ing", "ers", "er", "ed", "es", "s")
+_SUFFIX_RE = "(?:" + "|".join(_SUFFIXES) + ")?"
+_WS = re.compile(r"\s+")
+
+
+def _norm(s: str) -> str:
+    return _WS.sub(" ", (s or "").strip().lower())
+
+
+def _stem(word: str) -> str:
+    for suf in _SUFFIXES:
+        if word.endswith(suf) and len(word) - len(suf) >= 3:
+            return word[: -len(suf)]
+    return word
+
+
+def _stem_phrase(phrase: str) -> str:
+    head, _, last = phrase.rpartition(" ")
+    return (head + " " if head else "") + _stem(last)
+
+
+def _trie_regex(words: Iterable[str]) -> str:
+    """
+    Prefix-factored alternation ("search", "semantic" -> "se(?:arch|mantic)"), so the
+    regex engine walks shared prefixes once instead of retrying every keyword at
+    every position. Spaces inside phrases match any whitespace run.
+    """
+    trie: Dict[str, dict] = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def _emit(node: Dict[str, dict]) -> Optional[str]:
+        if set(node) == {""}:
+            return None
+        alts: List[str] = []
+        chars: List[str] = []
+        for ch in sorted(k for k in node if k):
+            sub = _emit(node[ch])
+            tok = r"\s+" if ch == " " else re.escape(ch)
+            if sub is None and ch != " ":
+                chars.append(tok)
+            else:
+                alts.append(tok + (sub or ""))
+        only_chars = not alts
+        if chars:
+            alts.append(chars[0] if len(chars) == 1 else "[" + "".join(chars) + "]")
+        if len(alts) == 1:
+            out, atomic = alts[0], only_chars
+        else:
+            out, atomic = "(?:" + "|".join(alts) + ")", True
+        if "" in node:
+            out = out + "?" if atomic else "(?:" + out + ")?"
+        return out
+
+    return _emit(trie) or ""
+
+
+class KeywordMatcher:
+    """
+    Multi-keyword matcher compiled once into a single trie-shaped regex.
+
+    mode:
+      "substring" - same semantics as `k.lower() in text` (the historical behaviour)
+      "word"      - keyword must sit on word boundaries ("ANN" no longer hits "planning")
+      "stem"      - word boundaries plus light suffix folding ("ranking" ~ "ranked", "rank")
+
+    Matching cost grows with text length, not with the number of keywords.
+    findall() reports non-overlapping matches, longest keyword first at each position.
+    """
+
+    def __init__(self, keywords: Iterable[str], mode: str = "substring"):
+        if mode not in MODES:
+            raise ValueError(f"Unknown keyword match mode: {mode!r} (expected one of {MODES})")
+        self.mode = mode
+        self.keywords: List[str] = []
+        self._canon: Dict[str, str] = {}
+        for k in keywords or []:
+            n = _norm(k)
+            if not n:
+                continue
+            key = _stem_phrase(n) if mode == "stem" else n
+            if key not in self._canon:
+                self._canon[key] = k
+                self.keywords.append(k)
+
+        self._re = None
+        if self._canon:
+            body = _trie_regex(self._canon)
+            if mode == "substring":
+                pat = body
+            elif mode == "word":
+                pat = rf"(?<!\w)(?:{body})(?!\w)"
+            else:
+                pat = rf"(?<!\w)(?:{body}){_SUFFIX_RE}(?!\w)"
+            self._re = re.compile(pat)
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def _lookup(self, matched: str) -> Optional[str]:
+        n = _norm(matched)
+        if n in self._canon:
+            return self._canon[n]
+        # stem mode: strip whatever suffix the regex consumed until we hit a stored stem
+        for suf in _SUFFIXES:
+            if n.endswith(suf) and n[: -len(suf)] in self._canon:
+                return self._canon[n[: -len(suf)]]
+        return None
+
+    def search(self, text: str) -> bool:
+        """True if any keyword occurs in text."""
+        return bool(self._re and text and self._re.search(text.lower()))
+
+    def findall(self, *texts: str) -> List[str]:
+        """Distinct keywords (as configured) found across texts, in first-seen order."""
+        if not self._re:
+            return []
+        found: Dict[str, None] = {}
+        for text in texts:
+            if not text:
+                continue
+            for m in self._re.finditer(text.lower()):
+                k = self._lookup(m.group(0))
+                if k is not None:
+                    found.setdefault(k, None)
+        return list(found)
@@ -47,6 +47,7 @@ def summarize_items_llm(items: List[Dict[str, Any]], audience: str, llm=None) ->
     """
     audience: 'executive' | 'consulting' | 'linkedin'
     llm: instance of src.llm.provider.LLMProvider (optional). If None, a local one is created.
+         Responses are cached when `llm` carries an LLMCache (see LLMProvider.query_openai).
     Returns: list[str] paragraphs/bullets suitable for pdf sections.
     """
     if llm is None:
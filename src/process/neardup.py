@@ -0,0 +1,123 @@
+# src/process/neardup.py
+from __future__ import annotations
+import hashlib
+import re
+from typing import Any, Dict, List
+
+_TAG = re.compile(r"<[^>]+>")
+_PREFIX = re.compile(r"^\s*\[[^\]]{1,20}\]\s*")  # "[Reddit] ", "[GitHub] " ...
+_WORD = re.compile(r"\w+")
+
+BITS = 64
+
+# Bit-sliced counting: each fingerprint bit gets its own 20-bit lane in one big int,
+# so summing a feature hash is 8 table lookups + adds instead of 64 bit tests.
+_LANE = 20
+_LANE_MASK = (1 << _LANE) - 1
+_SPREAD = [[sum(((b >> i) & 1) << ((k * 8 + i) * _LANE) for i in range(8)) for b in range(256)]
+           for k in range(8)]
+
+
+def _features(item: Dict[str, Any], k: int = 3) -> List[str]:
+    title = _PREFIX.sub("", item.get("title") or "")
+    text = f"{title} {_TAG.sub(' ', item.get('summary') or '')}".lower()
+    words = _WORD.findall(text)
+    if len(words) < k:
+        return words
+    return [" ".join(words[i:i + k]) for i in range(len(words) - k + 1)]
+
+
+def simhash(features: List[str]) -> int:
+    """64-bit SimHash: similar feature sets -> fingerprints a few bits apart."""
+    if not features:
+        return 0
+    features = features[:_LANE_MASK]  # keep lane counts from overflowing
+    s0, s1, s2, s3, s4, s5, s6, s7 = _SPREAD
+    acc = 0
+    for f in features:
+        d = hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest()
+        acc += (s0[d[0]] + s1[d[1]] + s2[d[2]] + s3[d[3]]
+                + s4[d[4]] + s5[d[5]] + s6[d[6]] + s7[d[7]])
+    half = len(features) / 2.0
+    out = 0
+    for bit in range(BITS):
+        if (acc >> (bit * _LANE)) & _LANE_MASK > half:
+            out |= 1 << bit
+    return out
+
+
+def _merge_citations(rep: Dict[str, Any], dup: Dict[str, Any]) -> None:
+    cites = rep.setdefault("citations", [])
+    seen = {(c.get("url") or "").split("#")[0].lower() for c in cites}
+    extra = list(dup.get("citations") or [])
+    if dup.get("url"):
+        # keep the duplicate's own page (e.g. the Reddit thread) in the link pool
+        extra.append({"title": dup.get("title") or dup["url"], "url": dup["url"], "date": dup.get("date") or ""})
+    for c in extra:
+        key = (c.get("url") or "").split("#")[0].lower()
+        if key and key not in seen:
+            seen.add(key)
+            cites.append(dict(c))
+
+
+def collapse_near_duplicates(items: List[Dict[str, Any]], max_hamming: int = 3) -> List[Dict[str, Any]]:
+    """
+    Cluster items whose title+summary SimHash fingerprints are within `max_hamming` bits,
+    using LSH banding so only items sharing a band are compared (roughly linear).
+    The fingerprint is cut into max_hamming + 1 bands, so any pair within the
+    threshold agrees exactly on at least one band; larger thresholds mean
+    narrower bands and more candidate pairs.
+    Each cluster collapses to its first item (callers pass ranked input), which
+    absorbs every member's citations and URL and records "duplicates" and "also_in".
+    Input dicts are not mutated.
+    """
+    n = len(items)
+    if n < 2:
+        return list(items)
+
+    prints = [simhash(_features(it)) for it in items]
+    parent = list(range(n))
+
+    def _find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    # max_hamming + 1 bands (pigeonhole): e.g. 3 bits -> 4 x 16-bit bands
+    bands = max(1, min(int(max_hamming) + 1, BITS))
+    edges = [b * BITS // bands for b in range(bands + 1)]
+    masks = [((1 << (hi - lo)) - 1, lo) for lo, hi in zip(edges, edges[1:])]
+    buckets: Dict[tuple, List[int]] = {}
+    for i, fp in enumerate(prints):
+        if fp == 0:
+            continue  # no text to compare
+        for b, (mask, shift) in enumerate(masks):
+            buckets.setdefault((b, (fp >> shift) & mask), []).append(i)
+
+    for members in buckets.values():
+        for x in range(len(members)):
+            i = members[x]
+            for j in members[x + 1:]:
+                if bin(prints[i] ^ prints[j]).count("1") <= max_hamming:
+                    ri, rj = _find(i), _find(j)
+                    if ri != rj:
+                        parent[max(ri, rj)] = min(ri, rj)  # lowest index (best ranked) stays root
+
+    out: List[Dict[str, Any]] = []
+    reps: Dict[int, Dict[str, Any]] = {}
+    for i, it in enumerate(items):
+        root = _find(i)
+        if root == i:
+            rep = dict(it)
+            rep["citations"] = [dict(c) for c in (it.get("citations") or [])]
+            reps[i] = rep
+            out.append(rep)
+            continue
+        rep = reps[root]
+        _merge_citations(rep, it)
+        rep["duplicates"] = rep.get("duplicates", 0) + 1
+        src = it.get("source")
+        if src and src != rep.get("source") and src not in rep.setdefault("also_in", []):
+            rep["also_in"].append(src)
+    return out
@@ -0,0 +1,156 @@
+# src/process/rank_engine.py
+from __future__ import annotations
+import re
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from src.utils.dates import parse_dt, parse_dts
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STOP = {
+    "a", "an", "and", "or", "the", "of", "in", "on", "for", "to", "with", "by",
+    "at", "from", "as", "is", "are", "be", "it", "its", "this", "that", "latest",
+}
+
+DEFAULT_WEIGHTS = {
+    "bm25": 1.0,       # relevance vs topics + include_keywords
+    "recency": 0.8,    # exponential decay by age
+    "source": 0.4,     # ranking.source_weights (default 1.0 per source)
+    "citations": 0.3,  # citations + collapsed duplicates, log-scaled
+    "title": 0.1,      # the old basic_score signal; now a tie-breaker
+}
+
+# Body text beyond this many chars adds little to BM25 and dominates tokenising cost
+_CONTENT_CHARS = 2000
+
+
+def _tokens(text: str) -> List[str]:
+    return _TOKEN.findall((text or "").lower())
+
+
+def query_terms(cfg: Dict[str, Any]) -> List[str]:
+    """Distinct non-stopword tokens from topics, research topics and include_keywords."""
+    phrases = list(cfg.get("topics", []) or [])
+    phrases += list(cfg.get("research", {}).get("topics", []) or [])
+    phrases += list(cfg.get("filters", {}).get("include_keywords", []) or [])
+    seen: Dict[str, None] = {}
+    for p in phrases:
+        for t in _tokens(p):
+            if t not in _STOP and len(t) > 1:
+                seen.setdefault(t, None)
+    return list(seen)
+
+
+def _bm25(items: List[Dict[str, Any]], terms: List[str], k1: float = 1.2, b: float = 0.75) -> np.ndarray:
+    n, t = len(items), len(terms)
+    if not n or not t:
+        return np.zeros(n)
+    col = {term: j for j, term in enumerate(terms)}
+    doc_len = np.empty(n)
+    flat: List[int] = []
+    for i, it in enumerate(items):
+        toks = _tokens(it.get("title") or "") * 2  # title counts double
+        toks += _tokens(it.get("summary") or "")
+        content = it.get("content") or ""
+        if content and content != it.get("summary"):
+            toks += _tokens(content[:_CONTENT_CHARS])
+        doc_len[i] = len(toks)
+        base = i * t
+        flat.extend(base + col[tok] for tok in toks if tok in col)
+    tf = np.bincount(np.asarray(flat, dtype=np.int64), minlength=n * t).reshape(n, t).astype(float)
+
+    df = (tf > 0).sum(axis=0)
+    idf = np.log1p((n - df + 0.5) / (df + 0.5))
+    avgdl = max(doc_len.mean(), 1.0)
+    norm = k1 * (1.0 - b + b * doc_len / avgdl)
+    return (tf * (k1 + 1.0) / (tf + norm[:, None]) * idf).sum(axis=1)
+
+
+def _normalise(x: np.ndarray) -> np.ndarray:
+    top = x.max() if x.size else 0.0
+    return x / top if top > 0 else np.zeros_like(x)
+
+
+def prescorer(cfg: Dict[str, Any], now: Optional[datetime] = None) -> Callable[[Dict[str, Any]], float]:
+    """
+    Cheap per-item stand-in for score_items, used to pick which streamed items
+    enter the candidate pool. Same weights and features, except relevance is
+    saturating query-term hits in title/summary (BM25 needs corpus statistics)
+    and citations are log-scaled against a fixed cap instead of the batch max.
+    """
+    rcfg = cfg.get("ranking", {}) or {}
+    weights = {**DEFAULT_WEIGHTS, **(rcfg.get("weights", {}) or {})}
+    half_life = float(rcfg.get("half_life_days", 14))
+    undated = float(rcfg.get("undated_recency", 0.3))
+    source_w = rcfg.get("source_weights", {}) or {}
+    now_ts = (now or datetime.now(timezone.utc)).timestamp()
+    terms = frozenset(query_terms(cfg))
+    cite_cap = np.log1p(10.0)
+
+    def _score(it: Dict[str, Any]) -> float:
+        hits = 2 * len(terms.intersection(_tokens(it.get("title") or "")))
+        hits += len(terms.intersection(_tokens((it.get("summary") or "")[:_CONTENT_CHARS])))
+        dt = parse_dt(it.get("date") or it.get("published"))
+        if dt:
+            recency = 0.5 ** (max(now_ts - dt.timestamp(), 0.0) / 86400.0 / half_life)
+        else:
+            recency = undated
+        cites = len(it.get("citations") or []) + int(it.get("duplicates", 0))
+        return (
+            weights.get("bm25", 0.0) * (1.0 - 0.5 ** (hits / 2.0))
+            + weights.get("recency", 0.0) * recency
+            + weights.get("source", 0.0) * float(source_w.get(it.get("source"), 1.0))
+            + weights.get("citations", 0.0) * min(float(np.log1p(cites)) / cite_cap, 1.0)
+            + weights.get("title", 0.0) * min(len(it.get("title") or ""), 140) / 140.0
+        )
+    return _score
+
+
+def score_items(items: List[Dict[str, Any]], cfg: Dict[str, Any],
+                now: Optional[datetime] = None, top_k: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Score all candidates in one vectorised pass and return them best-first
+    (only the best `top_k` when given). Sets it["score"] and it["score_breakdown"]
+    (weighted contribution per feature). Weights and knobs live under `ranking`.
+    """
+    n = len(items)
+    if not n:
+        return []
+    rcfg = cfg.get("ranking", {}) or {}
+    weights = {**DEFAULT_WEIGHTS, **(rcfg.get("weights", {}) or {})}
+    half_life = float(rcfg.get("half_life_days", 14))
+    undated = float(rcfg.get("undated_recency", 0.3))
+    source_w = rcfg.get("source_weights", {}) or {}
+    now_ts = (now or datetime.now(timezone.utc)).timestamp()
+
+    ts = np.array([
+        dt.timestamp() if dt else np.nan
+        for dt in parse_dts(it.get("date") or it.get("published") for it in items)
+    ])
+    age_days = np.clip((now_ts - ts) / 86400.0, 0.0, None)
+    recency = np.where(np.isnan(ts), undated, np.power(0.5, age_days / half_life))
+
+    features = {
+        "bm25": _normalise(_bm25(items, query_terms(cfg))),
+        "recency": recency,
+        "source": np.array([float(source_w.get(it.get("source"), 1.0)) for it in items]),
+        "citations": _normalise(np.log1p(np.array(
+            [len(it.get("citations") or []) + int(it.get("duplicates", 0)) for it in items], dtype=float))),
+        "title": np.array([min(len(it.get("title") or ""), 140) / 140.0 for it in items]),
+    }
+    names = list(features)
+    contrib = np.vstack([weights.get(f, 0.0) * features[f] for f in names])  # (features, n)
+    total = contrib.sum(axis=0)
+
+    order = np.argsort(-total, kind="stable")
+    if top_k is not None:
+        order = order[:top_k]
+    out = []
+    for i in order:
+        it = items[i]
+        it["score"] = round(float(total[i]), 4)
+        it["score_breakdown"] = {f: round(float(contrib[k, i]), 4) for k, f in enumerate(names)}
+        out.append(it)
+    return out
@@ -0,0 +1,50 @@
+"""LLM cache rerun test (offline). Usage: python -m src.tests.test_llm_cache [--gap-s 1.5]
+
+Runs make_sections_for_pdfs twice on the same items against the recorded LLM
+fixtures and checks that the second run is answered entirely from the LLM
+cache, i.e. nothing time-dependent leaks into the prompts.
+"""
+import argparse, os, tempfile, time
+
+for _k in ('OPENAI_API_KEY', 'PERPLEXITY_API_KEY'):
+    os.environ.setdefault(_k, 'test')
+
+from src.bench.corpus import synthetic_items
+from src.bench.fixtures import FixtureTransport
+from src.utils import cache, http
+from src.utils.config import load_config
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--gap-s', type=float, default=1.5, help='pause between the two runs')
+    args = ap.parse_args()
+
+    import src.main as pipeline
+    from src.llm.cache import LLMCache
+    from src.llm.provider import LLMProvider
+
+    cfg = load_config('config.yaml')
+    cache.configure({'cache': {'dir': tempfile.mkdtemp(prefix='search-intel-llmcache-')}})
+    http.set_transport(FixtureTransport())
+    llm_cache = LLMCache.from_config(cfg)
+    llm = LLMProvider(cache=llm_cache)
+    models = {k: cfg.get('models', {}).get(k) for k in ('executive', 'consulting', 'linkedin')}
+    pool = pipeline.filter_rank(synthetic_items(300, seed=1), cfg)
+
+    pipeline.make_sections_for_pdfs(llm, [dict(it) for it in pool], cfg, models)
+    first = llm_cache.stats.as_dict()
+    time.sleep(args.gap_s)
+    pipeline.make_sections_for_pdfs(llm, [dict(it) for it in pool], cfg, models)
+    total = llm_cache.stats.as_dict()
+    second = {k: total[k] - first[k] for k in total}
+
+    print('first run: ', first)
+    print('second run:', second)
+    if not first['misses']:
+        raise SystemExit('❌ first run made no LLM calls')
+    if second['misses'] or second['hits'] != first['misses']:
+        raise SystemExit('❌ rerun missed the LLM cache: the prompts changed between runs')
+    print('✅ rerun served from the LLM cache')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""CLI startup benchmark (offline). Usage: python -m src.tests.test_startup [--runs 7] [--budget-ms 100]
+
+Times fresh interpreters doing `import src.main` and the `--schedule` early exit,
+and checks that no heavy dependency gets imported on those paths.
+"""
+import argparse, json, os, statistics, subprocess, sys, time
+
+# Must stay out of sys.modules until a source / LLM / output actually needs them
+HEAVY = ['feedparser', 'bs4', 'numpy', 'openai', 'fpdf', 'httpx', 'smtplib', 'sqlite3']
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def _time_cmd(args, runs):
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=ROOT, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+def _heavy_loaded():
+    probe = f"import sys, src.main; print(__import__('json').dumps([m for m in {HEAVY!r} if m in sys.modules]))"
+    out = subprocess.run([sys.executable, '-c', probe], cwd=ROOT, check=True, capture_output=True, text=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--runs', type=int, default=7)
+    ap.add_argument('--budget-ms', type=float, default=100.0,
+                    help='fail if the --schedule exit costs more than this on top of a bare interpreter')
+    args = ap.parse_args()
+
+    baseline = _time_cmd(['-c', 'pass'], args.runs)
+    imp = _time_cmd(['-c', 'import src.main'], args.runs)
+    sched = _time_cmd(['-m', 'src.main', '--schedule'], args.runs)
+    heavy = _heavy_loaded()
+
+    print(f'interpreter:          {baseline:7.1f} ms')
+    print(f'import src.main:      {imp:7.1f} ms  (+{imp - baseline:.1f})')
+    print(f'--schedule exit:      {sched:7.1f} ms  (+{sched - baseline:.1f})')
+    print('heavy modules loaded:', heavy or 'none')
+
+    if heavy:
+        raise SystemExit(f'❌ eager imports on the startup path: {", ".join(heavy)}')
+    if sched - baseline > args.budget_ms:
+        raise SystemExit(f'❌ --schedule exit took +{sched - baseline:.0f} ms (budget {args.budget_ms:.0f} ms)')
+    print('✅ startup within budget')
+
+if __name__ == '__main__':
+    main()
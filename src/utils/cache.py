@@ -0,0 +1,79 @@
+# src/utils/cache.py
+from __future__ import annotations
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Dict, Optional
+
+# Root for every on-disk cache (feeds, LLM responses, ...). Override with
+# `cache.dir` in config.yaml or SEARCH_INTEL_CACHE_DIR.
+DEFAULT_DIR = ".cache"
+
+_root = os.getenv("SEARCH_INTEL_CACHE_DIR", DEFAULT_DIR)
+
+
+def configure(cfg: Optional[Dict[str, Any]] = None) -> None:
+    global _root
+    _root = (cfg or {}).get("cache", {}).get("dir") or os.getenv("SEARCH_INTEL_CACHE_DIR", DEFAULT_DIR)
+
+
+def cache_path(*parts: str) -> str:
+    """Path under the cache root; parent directories are created on demand."""
+    path = os.path.join(_root, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
+
+
+def key_for(*parts: Any) -> str:
+    """Stable hex key for any JSON-serialisable parts."""
+    raw = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def read_json(path: str) -> Optional[Any]:
+    """Return the parsed file, or None if it's missing or unreadable."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_json(path: str, obj: Any) -> None:
+    """Atomic write (temp file + rename) so a crashed run never leaves half a cache file."""
+    d = os.path.dirname(path) or "."
+    os.makedirs(d, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=d, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(obj, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class CacheStats:
+    """Thread-safe hit/miss counters, reported in the QA appendix."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def hit(self) -> None:
+        with self._lock:
+            self.hits += 1
+
+    def miss(self) -> None:
+        with self._lock:
+            self.misses += 1
+
+    def as_dict(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
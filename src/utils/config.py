@@ -4,7 +4,8 @@ from dotenv import load_dotenv
 def load_config(cfg_path: str = 'config.yaml'):
     load_dotenv()
     with open(cfg_path, 'r', encoding='utf-8') as f:
-        return yaml.safe_load(f)
+        # libyaml's loader when available: same safe subset, ~10x faster parse
+        return yaml.load(f, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
 
 
 
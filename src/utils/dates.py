@@ -1,8 +1,12 @@
 # src/utils/dates.py
 from __future__ import annotations
+import time
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional
 
+# Last-resort formats for strings neither fromisoformat nor RFC 822 accept
 ISO_FORMATS = (
     "%Y-%m-%dT%H:%M:%S%z",
     "%Y-%m-%dT%H:%M:%S.%f%z",
@@ -11,22 +15,53 @@ ISO_FORMATS = (
     "%Y-%m-%d",
 )
 
-def parse_dt(s: Optional[str]) -> Optional[datetime]:
-    if not s:
-        return None
-    s = s.strip()
-    if s.endswith("Z"):
-        s = s[:-1] + "+00:00"
+def _utc(dt: datetime) -> datetime:
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+@lru_cache(maxsize=16384)
+def _parse_str(s: str) -> Optional[datetime]:
+    # 1) ISO 8601 (GitHub, Twitter, Reddit, Perplexity); 3.11 accepts "Z" and fractions
+    try:
+        return _utc(datetime.fromisoformat(s))
+    except ValueError:
+        pass
+    # 2) RFC 822/2822 (RSS pubDate, HTTP dates): "Tue, 05 Aug 2025 14:03:00 GMT"
+    try:
+        return _utc(parsedate_to_datetime(s))
+    except (TypeError, ValueError, IndexError):
+        pass
     for fmt in ISO_FORMATS:
         try:
-            dt = datetime.strptime(s, fmt)
-            if dt.tzinfo is None:
-                dt = dt.replace(tzinfo=timezone.utc)
-            return dt.astimezone(timezone.utc)
-        except Exception:
+            return _utc(datetime.strptime(s, fmt))
+        except ValueError:
             continue
     return None
 
+def parse_dt(s: Any) -> Optional[datetime]:
+    """
+    Best-effort UTC datetime from an ISO 8601 / RFC 822 string, a datetime, or a
+    feedparser `*_parsed` struct (always UTC). Returns None when unparseable.
+    String results are memoised, so repeated dates (citations, reruns) are free.
+    """
+    if not s:
+        return None
+    if isinstance(s, str):
+        return _parse_str(s.strip())
+    if isinstance(s, datetime):
+        return _utc(s)
+    if isinstance(s, (time.struct_time, tuple)):
+        try:
+            return datetime(*s[:6], tzinfo=timezone.utc)
+        except (TypeError, ValueError):
+            return None
+    return None
+
+def parse_dts(values: Iterable[Any]) -> List[Optional[datetime]]:
+    """Batch parse_dt; each distinct string is parsed once."""
+    return [parse_dt(v) for v in values]
+
 def within_days(dt: Optional[datetime], days: int, now: Optional[datetime] = None) -> bool:
     if not dt:
         return False
@@ -0,0 +1,142 @@
+# src/utils/http.py
+from __future__ import annotations
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from src.utils import resilience
+
+if TYPE_CHECKING:  # httpx itself is imported on first use; it's ~150ms of startup
+    import httpx
+
+# Defaults; override with the `http` block in config.yaml (see configure()).
+DEFAULTS: Dict[str, Any] = {
+    "max_connections": 32,       # total sockets across all hosts
+    "max_keepalive": 16,         # idle sockets kept warm for reuse
+    "keepalive_expiry_s": 60.0,  # drop idle sockets after this long
+    "timeout_s": 30.0,           # default per-request timeout
+    "connect_timeout_s": 10.0,
+    "http2": True,               # only used when the `h2` package is installed
+}
+
+_settings: Dict[str, Any] = dict(DEFAULTS)
+_client: Optional[httpx.Client] = None
+_transport: Optional[httpx.BaseTransport] = None
+_lock = threading.Lock()
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401  (pip install httpx[http2])
+        return True
+    except ImportError:
+        return False
+
+
+def configure(cfg: Optional[Dict[str, Any]] = None) -> None:
+    """Apply `http` settings from config.yaml. Drops any existing client so the next call rebuilds it."""
+    global _client
+    with _lock:
+        _settings.clear()
+        _settings.update(DEFAULTS)
+        _settings.update((cfg or {}).get("http", {}) or {})
+        if _client is not None:
+            _client.close()
+            _client = None
+
+
+def set_transport(transport: Optional[httpx.BaseTransport]) -> None:
+    """
+    Route every request through `transport` (e.g. the offline fixture replay in
+    src.bench) instead of the network; None restores the default. Survives configure().
+    """
+    global _client, _transport
+    with _lock:
+        _transport = transport
+        if _client is not None:
+            _client.close()
+            _client = None
+
+
+def _limits_and_timeout():
+    import httpx
+
+    limits = httpx.Limits(
+        max_connections=int(_settings["max_connections"]),
+        max_keepalive_connections=int(_settings["max_keepalive"]),
+        keepalive_expiry=float(_settings["keepalive_expiry_s"]),
+    )
+    timeout = httpx.Timeout(float(_settings["timeout_s"]), connect=float(_settings["connect_timeout_s"]))
+    return limits, timeout
+
+
+def _build_client() -> httpx.Client:
+    import httpx
+
+    limits, timeout = _limits_and_timeout()
+    http2 = bool(_settings["http2"]) and _http2_available()
+    # Every request passes its host's circuit breaker (see resilience); an explicit
+    # transport replaces the client's own pool, so the limits go on the inner one
+    inner = _transport or httpx.HTTPTransport(http2=http2, limits=limits)
+    return httpx.Client(
+        http2=http2,
+        limits=limits,
+        timeout=timeout,
+        follow_redirects=True,  # match requests' default
+        transport=resilience.BreakerTransport(inner),
+    )
+
+
+def async_client() -> httpx.AsyncClient:
+    """
+    New AsyncClient with the same pool/timeout settings, routed through the
+    set_transport() transport when it can serve async requests. Async clients
+    belong to the event loop that uses them, so the caller owns this one:
+    `async with http.async_client() as client: ...`
+    """
+    import httpx
+
+    limits, timeout = _limits_and_timeout()
+    http2 = bool(_settings["http2"]) and _http2_available()
+    if isinstance(_transport, httpx.AsyncBaseTransport):
+        inner = _transport
+    else:
+        inner = httpx.AsyncHTTPTransport(http2=http2, limits=limits)
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=limits,
+        timeout=timeout,
+        follow_redirects=True,
+        transport=resilience.AsyncBreakerTransport(inner),
+    )
+
+
+def get_client() -> httpx.Client:
+    """
+    Process-wide pooled client. Connections are kept alive per host, so repeated
+    calls to api.github.com / api.perplexity.ai skip the TCP+TLS handshake.
+    Safe to share across the collection worker threads.
+    """
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = _build_client()
+    return _client
+
+
+def get(url: str, retries: Optional[int] = None, **kwargs) -> httpx.Response:
+    """GET with jittered-backoff retries on 429/5xx and connection errors (resilience.retries)."""
+    return resilience.call(lambda: get_client().get(url, **kwargs), retries=retries)
+
+
+def post(url: str, retries: int = 0, **kwargs) -> httpx.Response:
+    """POST; not retried unless the caller knows the request is safe to repeat."""
+    return resilience.call(lambda: get_client().post(url, **kwargs), retries=retries)
+
+
+def close() -> None:
+    global _client
+    with _lock:
+        if _client is not None:
+            _client.close()
+            _client = None
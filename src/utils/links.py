@@ -2,7 +2,10 @@
 from __future__ import annotations
 from typing import List, Dict, Any
 from urllib.parse import urlparse
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
 from src.utils.dates import parse_dt, within_days, fmt_short_date
 
 # Never amplify competitor domains in public-facing places
@@ -92,3 +95,62 @@ def add_date_suffix(links: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
 def pick_top(links: List[Dict[str, Any]], n: int) -> List[Dict[str, Any]]:
     """Small helper to make main.py more readable."""
     return links[:n]
+
+
+class LinkIndex:
+    """
+    Every candidate link parsed once per run: canonical key, host, timestamp and
+    social/competitor flags, held as NumPy columns next to the link dicts.
+    Audience selection is then a few boolean masks instead of re-parsing URLs
+    and dates per filter. Links are deduped and sorted newest-first (undated last),
+    matching dedupe_links + sort_links_by_date_desc.
+    """
+
+    def __init__(self, links: List[Dict[str, Any]]):
+        epoch = datetime(1970, 1, 1, tzinfo=timezone.utc)
+        seen = set()
+        uniq: List[Dict[str, Any]] = []
+        for ln in links:
+            url = (ln.get("url") or "").strip()
+            key = url.split("#")[0].lower()
+            if not url or key in seen:
+                continue
+            seen.add(key)
+            uniq.append(ln)
+        uniq.sort(key=lambda x: x.get("date") or epoch, reverse=True)
+
+        self.links = uniq
+        hosts = [_host(ln["url"]) for ln in uniq]
+        self.ts = np.array([ln["date"].timestamp() if ln.get("date") else np.nan for ln in uniq], dtype=float)
+        self.has_host = np.array([bool(h) for h in hosts], dtype=bool)
+        self.competitor = np.array([h in COMPETITOR_DENYLIST for h in hosts], dtype=bool)
+        self.social = np.array([h in SOCIAL_HOSTS for h in hosts], dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.links)
+
+    def select(self, exclude_social: bool, days: int, allow_undated: bool, min_needed: int,
+               limit: int, now: datetime) -> List[Dict[str, Any]]:
+        """
+        Same result as filter_exec/filter_cons/filter_li -> filter_by_recency -> pick_top,
+        for one audience, with a single shared `now`.
+        """
+        ok = self.has_host & ~self.competitor
+        if exclude_social:
+            ok &= ~self.social
+        dated = ~np.isnan(self.ts)
+        cutoff = (now - timedelta(days=days)).timestamp()
+        with np.errstate(invalid="ignore"):
+            is_fresh = dated & (self.ts >= cutoff)
+
+        picked = list(np.flatnonzero(ok & is_fresh))
+        if len(picked) < min_needed:
+            if allow_undated:
+                picked += list(np.flatnonzero(ok & ~dated))
+            if len(picked) < min_needed:
+                picked += list(np.flatnonzero(ok & dated & ~is_fresh))
+        return [self.links[i] for i in picked[:limit]]
+
+
+def build_link_index(items: List[Dict[str, Any]]) -> LinkIndex:
+    return LinkIndex(extract_links_from_items(items))
@@ -0,0 +1,89 @@
+# src/utils/parallel.py
+from __future__ import annotations
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Poll interval used while some tasks are still queued, so a task that starts
+# mid-wait still gets its own timeout enforced promptly.
+_POLL_S = 0.25
+
+
+def run_tasks(
+    tasks: List[Tuple[str, Callable[[], Any]]],
+    max_workers: int = 8,
+    task_timeout: Optional[float] = None,
+    deadline: Optional[float] = None,
+    on_error: Optional[Callable[[str, BaseException], None]] = None,
+    default: Any = None,
+) -> List[Any]:
+    """
+    Run (label, fn) tasks on a bounded thread pool and return their results
+    in task order (not completion order), so callers get deterministic output.
+
+    task_timeout: seconds a single task may run once started.
+    deadline: seconds for the whole batch, measured from submission.
+    on_error(label, exc): called for exceptions and timeouts; the slot gets `default`.
+
+    Timed-out tasks are abandoned, not killed: Python threads can't be
+    interrupted, so the underlying call keeps running until its own network
+    timeout fires. Callers should keep those timeouts set.
+    """
+    results: List[Any] = [default] * len(tasks)
+    if not tasks:
+        return results
+
+    started: Dict[int, float] = {}
+
+    def _run(i: int, fn: Callable[[], Any]) -> Any:
+        started[i] = time.monotonic()
+        return fn()
+
+    def _fail(i: int, exc: BaseException) -> None:
+        if on_error:
+            on_error(tasks[i][0], exc)
+
+    run_deadline = time.monotonic() + deadline if deadline else None
+    pool = ThreadPoolExecutor(
+        max_workers=max(1, min(int(max_workers or 1), len(tasks))),
+        thread_name_prefix="task",
+    )
+    futures = {pool.submit(_run, i, fn): i for i, (_, fn) in enumerate(tasks)}
+    pending = set(futures)
+    try:
+        while pending:
+            now = time.monotonic()
+            waits = []
+            if run_deadline is not None:
+                waits.append(run_deadline - now)
+            if task_timeout:
+                for f in pending:
+                    t0 = started.get(futures[f])
+                    waits.append(t0 + task_timeout - now if t0 is not None else _POLL_S)
+            timeout = max(0.0, min(waits)) if waits else None
+
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for f in done:
+                i = futures[f]
+                try:
+                    results[i] = f.result()
+                except Exception as e:
+                    _fail(i, e)
+
+            now = time.monotonic()
+            if run_deadline is not None and now >= run_deadline:
+                for f in sorted(pending, key=futures.get):
+                    f.cancel()
+                    _fail(futures[f], TimeoutError(f"run deadline of {deadline}s exceeded"))
+                break
+            if task_timeout:
+                expired = {
+                    f for f in pending
+                    if futures[f] in started and now - started[futures[f]] >= task_timeout
+                }
+                for f in sorted(expired, key=futures.get):
+                    _fail(futures[f], TimeoutError(f"timed out after {task_timeout}s"))
+                pending -= expired
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    return results
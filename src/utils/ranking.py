@@ -1,5 +1,6 @@
 from __future__ import annotations
-from typing import List, Dict, Any
+import heapq
+from typing import List, Dict, Any, Tuple
 from datetime import datetime, timezone
 from src.utils.dates import parse_dt
 
@@ -28,3 +29,46 @@ def dedupe_items(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         seen.add(key)
         out.append(it)
     return out
+
+
+class TopK:
+    """
+    Bounded min-heap keeping the k best items offered so far, keyed by id.
+
+    Ties on score go to the smaller `order` (e.g. (source index, position)),
+    so the result doesn't depend on arrival order. Offering an id that is
+    already kept replaces it only when the new order is smaller.
+    """
+
+    def __init__(self, k: int):
+        self.k = max(0, int(k))
+        self._heap: List[list] = []  # [score, negated order, id, item]
+        self._by_id: Dict[str, list] = {}
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, key: str, score: float, order: Tuple[int, ...], item: Dict[str, Any]) -> bool:
+        """Offer an item; returns True if it is now in the heap."""
+        neg = tuple(-o for o in order)
+        entry = self._by_id.get(key)
+        if entry is not None:
+            if neg <= entry[1]:
+                return False
+            entry[0], entry[1], entry[3] = score, neg, item
+            heapq.heapify(self._heap)
+            return True
+        entry = [score, neg, key, item]
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif self._heap and entry[:2] > self._heap[0][:2]:
+            evicted = heapq.heapreplace(self._heap, entry)
+            del self._by_id[evicted[2]]
+        else:
+            return False
+        self._by_id[key] = entry
+        return True
+
+    def items(self) -> List[Dict[str, Any]]:
+        """Kept items, best first."""
+        return [e[3] for e in sorted(self._heap, key=lambda e: e[:2], reverse=True)]
@@ -0,0 +1,306 @@
+# src/utils/resilience.py
+from __future__ import annotations
+import email.utils
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Mapping, Optional
+
+from src.utils.cache import cache_path, read_json, write_json
+
+# Defaults; override with the `resilience` block in config.yaml (see configure()).
+DEFAULTS: Dict[str, Any] = {
+    "retries": 2,             # extra attempts for GETs (POSTs opt in per call)
+    "backoff_s": 1.0,         # base of the jittered exponential backoff
+    "max_backoff_s": 30.0,    # cap on any single sleep, Retry-After included
+    "failures": 5,            # consecutive failed attempts before a host's circuit opens
+    "cooldown_s": 900.0,      # first open period; doubles on every re-trip
+    "max_cooldown_s": 7 * 86400.0,
+    "probe_timeout_s": 5.0,   # a half-open host gets one attempt with this timeout
+    "hedge_after_s": 20.0,    # duplicate a slow LLM call after this long (0 = off)
+    "llm_timeout_s": 60.0,
+}
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+_settings: Dict[str, Any] = dict(DEFAULTS)
+
+
+def configure(cfg: Optional[Dict[str, Any]] = None) -> None:
+    """Apply `resilience` settings from config.yaml."""
+    rcfg = dict((cfg or {}).get("resilience", {}) or {})
+    rcfg.update(rcfg.pop("breaker", {}) or {})
+    _settings.clear()
+    _settings.update(DEFAULTS)
+    _settings.update(rcfg)
+
+
+def setting(name: str) -> Any:
+    return _settings[name]
+
+
+class CircuitOpen(RuntimeError):
+    """Raised instead of sending a request to a host whose circuit is open."""
+
+
+def retry_after_s(headers: Mapping[str, str]) -> Optional[float]:
+    """Retry-After as seconds (delta-seconds or HTTP-date form), or None."""
+    ra = headers.get("retry-after")
+    if not ra:
+        return None
+    try:
+        return max(float(ra), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(email.utils.parsedate_to_datetime(ra).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base_s: Optional[float] = None,
+                  headers: Optional[Mapping[str, str]] = None) -> float:
+    """Retry-After when the server sent one, else base * 2^attempt with ±50% jitter; capped."""
+    cap = float(_settings["max_backoff_s"])
+    ra = retry_after_s(headers) if headers is not None else None
+    if ra is not None:
+        return min(ra, cap)
+    base = float(_settings["backoff_s"] if base_s is None else base_s)
+    return min(base * (2 ** attempt) * (0.5 + random.random()), cap)
+
+
+def call(send: Callable[[], Any], retries: Optional[int] = None, backoff_s: Optional[float] = None,
+         retry_statuses=RETRY_STATUSES, before: Optional[Callable[[], None]] = None, label: str = "HTTP",
+         retry_if: Optional[Callable[[Any], bool]] = None):
+    """
+    send() with retries on retry_statuses and connection errors / timeouts,
+    sleeping backoff_delay() between attempts. The last response is returned
+    (callers still raise_for_status); an open circuit is never retried.
+    before: called ahead of every attempt (e.g. a rate limiter's acquire).
+    retry_if: response -> bool, replaces the retry_statuses check.
+    """
+    import httpx
+
+    retries = int(_settings["retries"] if retries is None else retries)
+    retry_if = retry_if or (lambda r: r.status_code in retry_statuses)
+    for attempt in range(retries + 1):
+        if before:
+            before()
+        try:
+            r = send()
+        except httpx.TransportError as e:
+            if attempt >= retries:
+                raise
+            delay = backoff_delay(attempt, backoff_s)
+            print(f"[{label}] {type(e).__name__}, retrying in {delay:.1f}s")
+            time.sleep(delay)
+            continue
+        if attempt < retries and retry_if(r):
+            delay = backoff_delay(attempt, backoff_s, r.headers)
+            print(f"[{label}] HTTP {r.status_code}, retrying in {delay:.1f}s")
+            time.sleep(delay)
+            continue
+        return r
+    return r
+
+
+class _Breakers:
+    """
+    Per-host circuit breakers, persisted under the cache dir so a host that
+    was dead last run is skipped straight away this run.
+
+    closed    → requests flow; `failures` consecutive failed attempts
+                (connection error, timeout, 5xx) open the circuit.
+    open      → requests fail fast with CircuitOpen until the cooldown ends.
+    half-open → one probe with probe_timeout_s; success closes the circuit,
+                failure re-opens it with double the cooldown.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._path: Optional[str] = None
+        self._state: Dict[str, Dict[str, Any]] = {}
+        self._probing: set = set()
+
+    def _load(self) -> None:
+        path = cache_path("breakers.json")
+        if path != self._path:  # first use, or the cache dir was reconfigured
+            self._path = path
+            self._state = read_json(path) or {}
+            self._probing = set()
+
+    def _save(self) -> None:
+        write_json(self._path, self._state)
+
+    def before(self, host: str) -> bool:
+        """Raise CircuitOpen, or return True when this request is the half-open probe."""
+        with self._lock:
+            self._load()
+            st = self._state.get(host)
+            if not st or not st.get("open_until"):
+                return False
+            wait_s = st["open_until"] - time.time()
+            if wait_s > 0 or host in self._probing:
+                raise CircuitOpen(f"circuit open for {host} ({st['failures']} failures; "
+                                  f"retry in {max(wait_s, 0):.0f}s)")
+            self._probing.add(host)
+            return True
+
+    def success(self, host: str) -> None:
+        # before() has just loaded the state, so a healthy host needs no lock or disk
+        if self._path is not None and host not in self._state and host not in self._probing:
+            return
+        with self._lock:
+            self._load()
+            self._probing.discard(host)
+            if host in self._state:
+                del self._state[host]
+                self._save()
+
+    def release(self, host: str) -> None:
+        """Drop an unfinished probe (cancelled / non-transport error): the next request probes again."""
+        with self._lock:
+            self._probing.discard(host)
+
+    def failure(self, host: str) -> None:
+        with self._lock:
+            self._load()
+            st = self._state.setdefault(host, {"failures": 0, "trips": 0, "open_until": None})
+            st["failures"] += 1
+            probe = host in self._probing
+            self._probing.discard(host)
+            if probe or st["failures"] >= int(_settings["failures"]):
+                cooldown = float(_settings["cooldown_s"]) * (2 ** st["trips"])
+                st["open_until"] = time.time() + min(cooldown, float(_settings["max_cooldown_s"]))
+                st["trips"] += 1
+                print(f"[Breaker] {host}: circuit open for {min(cooldown, float(_settings['max_cooldown_s'])):.0f}s "
+                      f"after {st['failures']} failures")
+                self._save()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            self._load()
+            return {h: dict(st) for h, st in self._state.items()}
+
+
+breakers = _Breakers()
+
+
+def _probe_timeout(request) -> None:
+    t = float(_settings["probe_timeout_s"])
+    request.extensions["timeout"] = {"connect": t, "read": t, "write": t, "pool": t}
+
+
+def _record(host: str, status: int) -> None:
+    if status >= 500:
+        breakers.failure(host)
+    else:
+        breakers.success(host)
+
+
+class BreakerTransport:
+    """Wraps a sync httpx transport so every request passes the host's breaker."""
+
+    def __init__(self, inner):
+        self.inner = inner
+
+    def handle_request(self, request):
+        import httpx
+
+        host = request.url.host
+        probe = breakers.before(host)
+        if probe:
+            _probe_timeout(request)
+        try:
+            resp = self.inner.handle_request(request)
+        except httpx.TransportError:
+            breakers.failure(host)
+            raise
+        except BaseException:  # no verdict (e.g. CancelledError): let the next request probe
+            if probe:
+                breakers.release(host)
+            raise
+        _record(host, resp.status_code)
+        return resp
+
+    def close(self) -> None:
+        self.inner.close()
+
+    def __enter__(self):
+        self.inner.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        self.inner.__exit__(*exc)
+
+
+class AsyncBreakerTransport:
+    """Async counterpart of BreakerTransport (http.async_client)."""
+
+    def __init__(self, inner):
+        self.inner = inner
+
+    async def handle_async_request(self, request):
+        import httpx
+
+        host = request.url.host
+        probe = breakers.before(host)
+        if probe:
+            _probe_timeout(request)
+        try:
+            resp = await self.inner.handle_async_request(request)
+        except httpx.TransportError:
+            breakers.failure(host)
+            raise
+        except BaseException:  # no verdict (e.g. CancelledError): let the next request probe
+            if probe:
+                breakers.release(host)
+            raise
+        _record(host, resp.status_code)
+        return resp
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+    async def __aenter__(self):
+        await self.inner.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.inner.__aexit__(*exc)
+
+
+_hedge_pool: Optional[ThreadPoolExecutor] = None
+_hedge_lock = threading.Lock()
+
+
+def hedged(fn: Callable[[], Any], after_s: Optional[float] = None, label: str = "LLM") -> Any:
+    """
+    Run fn(); if it hasn't finished after after_s, start one duplicate and
+    return whichever succeeds first. The loser is abandoned (threads can't be
+    cancelled) and its result discarded. after_s <= 0 runs fn() inline.
+    """
+    global _hedge_pool
+    after_s = float(_settings["hedge_after_s"] if after_s is None else after_s)
+    if after_s <= 0:
+        return fn()
+    with _hedge_lock:
+        if _hedge_pool is None:
+            _hedge_pool = ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4),
+                                             thread_name_prefix="hedge")
+    first = _hedge_pool.submit(fn)
+    done, _ = wait([first], timeout=after_s)
+    if done:
+        return first.result()
+    print(f"[{label}] no answer after {after_s:.0f}s; sending a hedge request")
+    pending = {first, _hedge_pool.submit(fn)}
+    error: Optional[BaseException] = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for f in done:
+            if f.exception() is None:
+                return f.result()
+            error = f.exception()
+    raise error
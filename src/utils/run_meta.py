@@ -1,9 +1,13 @@
 import os
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
-def collect_run_meta(cfg: Dict[str, Any], counts: Dict[str, int]) -> Dict[str, Any]:
-    """Create a dict of QA/run metadata to print into PDFs and footers."""
+def collect_run_meta(cfg: Dict[str, Any], counts: Dict[str, int],
+                     caches: Optional[Dict[str, Dict[str, int]]] = None) -> Dict[str, Any]:
+    """
+    Create a dict of QA/run metadata to print into PDFs and footers.
+    caches: optional {name: {"hits": n, "misses": n}} from the on-disk caches.
+    """
     tz = os.getenv("TZ", "Asia/Kolkata")
     now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
@@ -30,4 +34,5 @@ def collect_run_meta(cfg: Dict[str, Any], counts: Dict[str, int]) -> Dict[str, A
             "items_kept": int(counts.get("items_kept", 0)),
             "citations": int(counts.get("citations", 0)),
         },
+        "caches": {name: dict(st) for name, st in (caches or {}).items()},
     }
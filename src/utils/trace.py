@@ -0,0 +1,159 @@
+# src/utils/trace.py
+from __future__ import annotations
+import functools
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# Off unless configure() / enable() turns it on. When off, span() hands back a
+# shared no-op object and @traced is one flag check, so instrumented code pays
+# next to nothing.
+_enabled = False
+_lock = threading.Lock()
+_records: List[Dict[str, Any]] = []
+_local = threading.local()
+_pid = os.getpid()
+_perf0 = time.perf_counter()
+_wall0 = time.time()
+
+
+def configure(cfg: Optional[Dict[str, Any]] = None, force: bool = False) -> None:
+    """Enable from `trace.enabled` in config.yaml (or force=True, e.g. --trace)."""
+    if force or ((cfg or {}).get("trace", {}) or {}).get("enabled"):
+        enable()
+
+
+def enable() -> None:
+    global _enabled, _perf0, _wall0
+    with _lock:
+        _records.clear()
+        _perf0, _wall0 = time.perf_counter(), time.time()
+        _enabled = True
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs) -> None:
+        pass
+
+
+_NULL = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "cat", "attrs", "start", "parent")
+
+    def __init__(self, name: str, cat: str, attrs: Dict[str, Any]):
+        self.name, self.cat, self.attrs = name, cat, attrs
+
+    def set(self, **attrs) -> None:
+        """Attach attributes known only mid-span (cache hit, item count, ...)."""
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        self.parent = stack[-1] if stack else None
+        stack.append(self.name)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        _local.stack.pop()
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        _append(self.name, self.cat, self.start - _perf0, end - self.start,
+                threading.get_ident(), _pid, self.parent, self.attrs)
+        return False
+
+
+def _append(name, cat, start_s, dur_s, tid, pid, parent, attrs) -> None:
+    rec = {"name": name, "cat": cat, "start_s": round(start_s, 6), "dur_s": round(dur_s, 6),
+           "tid": tid, "pid": pid, "parent": parent, "attrs": attrs}
+    with _lock:
+        _records.append(rec)
+
+
+def span(name: str, cat: str = "stage", **attrs):
+    """with span("llm.chat", cat="llm", model=m) as sp: ...; sp.set(cached=True)"""
+    if not _enabled:
+        return _NULL
+    return _Span(name, cat, attrs)
+
+
+def traced(name: Optional[str] = None, cat: str = "stage"):
+    """Decorator form of span(); the span is named after the function by default."""
+    def deco(fn: Callable) -> Callable:
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Span(label, cat, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+
+def add(name: str, wall_start: float, dur_s: float, cat: str = "stage",
+        pid: Optional[int] = None, **attrs) -> None:
+    """Record a span measured elsewhere (e.g. in a worker process) from its wall-clock start."""
+    if _enabled:
+        _append(name, cat, wall_start - _wall0, dur_s, 0, pid or _pid, None, attrs)
+
+
+def records() -> List[Dict[str, Any]]:
+    with _lock:
+        return list(_records)
+
+
+def summary(top: int = 15) -> Dict[str, str]:
+    """{span name: "n=3  total 1.234s  max 0.812s"}, slowest total first (for the QA appendix)."""
+    agg: Dict[str, List[float]] = {}
+    for r in records():
+        agg.setdefault(r["name"], []).append(r["dur_s"])
+    rows = sorted(agg.items(), key=lambda kv: -sum(kv[1]))[:top]
+    return {name: f"n={len(d)}  total {sum(d):.3f}s  max {max(d):.3f}s" for name, d in rows}
+
+
+def write_jsonl(path: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for r in records():
+            f.write(json.dumps(r, ensure_ascii=False, default=str) + "\n")
+
+
+def write_chrome(path: str) -> None:
+    """Chrome trace-event JSON: open in chrome://tracing or https://ui.perfetto.dev."""
+    events = [
+        {
+            "name": r["name"], "cat": r["cat"], "ph": "X",
+            "ts": round(r["start_s"] * 1e6, 1), "dur": round(r["dur_s"] * 1e6, 1),
+            "pid": r["pid"], "tid": r["tid"],
+            "args": {k: (v if isinstance(v, (int, float, bool, str)) or v is None else str(v))
+                     for k, v in r["attrs"].items()},
+        }
+        for r in records()
+    ]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)